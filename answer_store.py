@@ -0,0 +1,55 @@
+"""
+Bundled answers for static questions, so common stat explanations need no GPT call.
+
+data/stat_explanations.json maps a canonical stat name to its aliases and an
+explanation. Anything not in the bundle falls through to the LRU caches in
+openai_helper.
+"""
+import json
+import os
+import re
+import unicodedata
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "stat_explanations.json")
+
+_explanations: dict[str, str] | None = None
+_aliases: dict[str, str] | None = None
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"[\"'()?!,]", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _load_seeds():
+    global _explanations, _aliases
+    if _explanations is not None:
+        return
+    explanations = {}
+    aliases = {}
+    try:
+        with open(SEED_PATH, encoding="utf-8") as f:
+            seeds = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not load bundled stat explanations from {SEED_PATH}:", e)
+        seeds = {}
+    for name, entry in seeds.items():
+        explanations[name] = entry["explanation"]
+        aliases[_fold(name)] = name
+        for alias in entry.get("aliases", []):
+            aliases[_fold(alias)] = name
+    _explanations, _aliases = explanations, aliases
+
+
+def canonical_stat_name(stat_name: str) -> str:
+    # "True Shooting Percentage", "ts%" and "TS%" all become "ts%"
+    _load_seeds()
+    folded = _fold(stat_name)
+    return _aliases.get(folded, folded)
+
+
+def seeded_explanation(stat_name: str) -> str | None:
+    _load_seeds()
+    return _explanations.get(canonical_stat_name(stat_name))
@@ -0,0 +1,205 @@
+"""
+Answers a file of questions and writes one JSON object per line.
+
+    python batch.py questions.txt -o results.jsonl
+    cat questions.txt | python batch.py > results.jsonl
+
+All questions are parsed first. The stats requests their actions need are then
+collected, deduplicated and fetched once each, so the actions themselves read
+from the warm cache.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from engine import QueryResult
+
+# engine, nba_stats and stats_cache read CHAT_NBA_* settings when imported,
+# so they are imported inside functions, after main() has loaded .env
+
+
+def fetchers() -> dict:
+    # Fetch key kind -> function called with the rest of the key
+    from stats_cache import get_league_game_log, get_league_player_stats, get_league_standings, get_player_career_stats, get_player_game_log_frame
+
+    return {
+        "leaguedashplayerstats": lambda season, season_type, per_mode: get_league_player_stats(season, season_type=season_type, per_mode=per_mode),
+        "leaguestandingsv3": lambda season: get_league_standings(season),
+        "playergamelog": lambda player_id, season, season_type: get_player_game_log_frame(player_id, season, season_type),
+        "playercareerstats": lambda player_id: get_player_career_stats(player_id, per_mode="PerGame"),
+        "leaguegamelog": lambda season, season_type: get_league_game_log(season, season_type),
+    }
+
+
+def fetch_plan(intent: dict) -> list[tuple]:
+    """
+    Returns the endpoint requests an intent's action will make, as hashable keys.
+    Mirrors the parameters the nba_stats functions pass to stats_cache.
+    """
+    from nba_stats import get_player_id, normalize_season, parse_date_range, per_mode_for_stat, resolve_seasons, season_for_date, stat_name_to_column
+    from season_store import LEAGUE_QUALIFIERS
+    from stats_cache import current_season
+
+    action = intent.get("action")
+    season = normalize_season(intent.get("season", ""))
+    season_type = intent.get("season_type", "Regular Season")
+
+    if action in ("get_top_players", "get_stat_leader"):
+        return [("leaguedashplayerstats", season, season_type, "Totals")]
+    if action == "get_team_leader":
+        stat_name = intent.get("stat_name", "")
+        return [("leaguedashplayerstats", season, "Regular Season", per_mode_for_stat(stat_name))]
+    if action == "get_league_average":
+        return [("leaguedashplayerstats", season, season_type, per_mode_for_stat(intent.get("stat_name", "")))]
+    if action == "compare_to_league_average":
+        # Percentages are compared on Totals, whatever the mode; the default stats include them
+        per_mode = intent.get("per_mode", "PerGame")
+        stats = [stat_name_to_column(stat) for stat in intent.get("stats", [])]
+        plan = [("leaguedashplayerstats", season, season_type, per_mode)]
+        if per_mode != "Totals" and (not stats or any(stat.endswith("_PCT") for stat in stats)):
+            plan.append(("leaguedashplayerstats", season, season_type, "Totals"))
+        return plan
+    if action == "get_player_rank":
+        # Qualified percentages are ranked on Totals, so other modes only need it for those
+        per_mode = intent.get("per_mode", "Totals")
+        stats = [stat_name_to_column(stat) for stat in intent.get("stats", [])]
+        plan = [("leaguedashplayerstats", season, season_type, per_mode)]
+        if per_mode != "Totals" and (not stats or any(stat in LEAGUE_QUALIFIERS for stat in stats)):
+            plan.append(("leaguedashplayerstats", season, season_type, "Totals"))
+        return plan
+    if action == "compare_players":
+        # Per-game numbers are derived from Totals
+        seasons = resolve_seasons(intent.get("seasons") or intent.get("season", ""))
+        return [("leaguedashplayerstats", season_id, "Regular Season", "Totals") for season_id in seasons]
+    if action in ("get_games_against", "get_head_to_head"):
+        return [("leaguegamelog", season, season_type)]
+    if action == "get_best_games":
+        window = parse_date_range(intent.get("date_range", "")) if intent.get("date_range") else None
+        if not season and window:
+            season = season_for_date(window[1])
+        return [("leaguegamelog", season, season_type)] if season else []
+    if action in ("get_team_record", "get_team_records", "get_conference_standings", "get_games_back"):
+        return [("leaguestandingsv3", season)]
+    if action == "get_player_game_log":
+        player_id = get_player_id(intent.get("player_name", ""))
+        if not player_id:
+            return []
+        if not season or season.lower() == "career":
+            # Read first; earlier seasons are only needed when it is short of the limit
+            return [("playergamelog", player_id, current_season(), season_type)]
+        return [("playergamelog", player_id, season, season_type)]
+    if action == "get_player_stats":
+        player_id = get_player_id(intent.get("player", ""))
+        return [("playercareerstats", player_id)] if player_id else []
+    return []
+
+
+def result_to_json(result: "QueryResult") -> dict:
+    output = result.output
+    if isinstance(output, pd.DataFrame):
+        # to_json handles numpy scalars and NaN; 6 significant digits hides float32 noise
+        output = json.loads(output.to_json(orient="records", double_precision=6))
+    return {
+        "question": result.question,
+        "intent": result.intent,
+        "result": output,
+        "error": result.error,
+    }
+
+
+async def run_batch(questions: list[str], concurrency: int, timeout: float) -> list["QueryResult"]:
+    from engine import QueryEngine, QueryResult
+
+    engine = QueryEngine(max_workers=concurrency, timeout=timeout)
+    fetch = fetchers()
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [QueryResult(question=question) for question in questions]
+
+    async def parse(result: QueryResult):
+        async with semaphore:
+            try:
+                result.intent = await asyncio.wait_for(engine.parse(result.question), timeout)
+            except Exception as e:
+                result.error = f"❌ Could not parse question: {e}"
+
+    async def prefetch(key: tuple):
+        kind, *args = key
+        async with semaphore:
+            try:
+                await loop.run_in_executor(engine.executor, lambda: fetch[kind](*args))
+            except Exception as e:
+                # The action will hit the same error and report it for its question
+                print(f"⚠️ Prefetch of {key} failed:", e, file=sys.stderr)
+
+    async def run(result: QueryResult):
+        if result.error:
+            return
+        async with semaphore:
+            try:
+                result.output = await asyncio.wait_for(engine.run_action(result.intent), timeout)
+            except asyncio.TimeoutError:
+                result.error = f"❌ Timed out after {timeout:g}s."
+            except Exception as e:
+                result.error = f"❌ Error answering question: {e}"
+
+    try:
+        await asyncio.gather(*(parse(result) for result in results))
+
+        unique_keys = []
+        for result in results:
+            for key in fetch_plan(result.intent):
+                if key not in unique_keys:
+                    unique_keys.append(key)
+        print(f"{len(questions)} questions need {len(unique_keys)} unique stats requests", file=sys.stderr)
+        await asyncio.gather(*(prefetch(key) for key in unique_keys))
+
+        await asyncio.gather(*(run(result) for result in results))
+    finally:
+        engine.close()
+    return results
+
+
+def read_questions(stream) -> list[str]:
+    # One question per line; blank lines and "#" comments are skipped
+    return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+
+
+def main():
+    # Before anything reads CHAT_NBA_* settings
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from engine import DEFAULT_TIMEOUT
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", help="file with one question per line (default: stdin)")
+    parser.add_argument("-o", "--output", help="JSONL file to write (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=8, help="questions parsed and answered at once")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per question")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            questions = read_questions(f)
+    else:
+        questions = read_questions(sys.stdin)
+
+    results = asyncio.run(run_batch(questions, args.concurrency, args.timeout))
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in results:
+            out.write(json.dumps(result_to_json(result), default=str) + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Latency and throughput of every action, served by recorded stats.nba.com and OpenAI
+fixtures (or synthetic stand-ins where nothing is recorded).
+
+    python -m benchmarks.actions                        # print a table
+    python -m benchmarks.actions --save base.json       # also save the results
+    python -m benchmarks.actions --compare base.json    # flag regressions against a saved run
+    python -m benchmarks.actions --record               # refresh fixtures from the live services
+
+Cold runs start every iteration with empty disk and memory caches; warm runs repeat
+the action with everything cached. Run from the repository root.
+
+No fixtures are committed, so unless --record has been run, every response is synthetic:
+generated stats.nba.com frames, a fixed-length GPT answer, and for parsing the intent
+listed for each question in benchmarks.queries.SAMPLE_INTENTS. The timings then measure
+this code and the simulated latencies, not the live services.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.queries import ACTION_INTENTS, SAMPLE_QUERIES
+from benchmarks.timing import summarize
+
+# A slower p50 or p95 only counts as a regression past both of these
+DEFAULT_THRESHOLD = 0.2
+MIN_REGRESSION_MS = 1.0
+
+# Actions whose answers can be streamed; their time to first token is measured too
+STREAMING_ACTIONS = {"explain_stat", "get_historical_nba_fact"}
+
+
+def reset_caches(cache_dir: str):
+    import game_store
+    import openai_helper
+    import season_store
+    import standings_store
+
+    # Cached frames live in one folder per endpoint; the LLM cache file is cleared in place
+    for entry in os.listdir(cache_dir):
+        if os.path.isdir(os.path.join(cache_dir, entry)):
+            shutil.rmtree(os.path.join(cache_dir, entry))
+    with season_store._lock:
+        season_store._frames.clear()
+    with game_store._lock:
+        game_store._games.clear()
+    with standings_store._lock:
+        standings_store._snapshots.clear()
+    for cache in (openai_helper.explanation_cache, openai_helper.historical_fact_cache, openai_helper.intent_cache):
+        cache.clear()
+
+
+async def _run_once(engine, name: str):
+    if name == "parse":
+        for question in SAMPLE_QUERIES:
+            await engine.parse(question)
+        return None
+    return await engine.run_action(ACTION_INTENTS[name])
+
+
+async def _time_to_first_token(engine, name: str) -> float:
+    start = time.perf_counter()
+    stream = await engine.run_action(ACTION_INTENTS[name], stream=True)
+    first = None
+    async for _ in stream:
+        if first is None:
+            first = (time.perf_counter() - start) * 1000
+    return first
+
+
+async def benchmark(names: list[str], cache_dir: str, cold: int, warm: int) -> dict:
+    from engine import QueryEngine
+
+    engine = QueryEngine()
+    results = {}
+    try:
+        for name in names:
+            cold_samples = []
+            for _ in range(cold):
+                reset_caches(cache_dir)
+                start = time.perf_counter()
+                output = await _run_once(engine, name)
+                cold_samples.append((time.perf_counter() - start) * 1000)
+            if isinstance(output, str) and output.startswith("❌"):
+                print(f"⚠️ {name} answered with an error: {output}", file=sys.stderr)
+
+            warm_samples = []
+            warm_start = time.perf_counter()
+            for _ in range(warm):
+                start = time.perf_counter()
+                await _run_once(engine, name)
+                warm_samples.append((time.perf_counter() - start) * 1000)
+            warm_seconds = time.perf_counter() - warm_start
+
+            results[name] = {
+                "cold": summarize(cold_samples),
+                "warm": summarize(warm_samples),
+                "warm_per_second": warm / warm_seconds if warm_seconds else None,
+            }
+            if name in STREAMING_ACTIONS:
+                first_token_samples = []
+                for _ in range(cold):
+                    reset_caches(cache_dir)
+                    first_token_samples.append(await _time_to_first_token(engine, name))
+                results[name]["first_token"] = summarize(first_token_samples)
+            print(f"  {name} done", file=sys.stderr)
+    finally:
+        engine.close()
+    return results
+
+
+def print_table(results: dict):
+    print(f"{'action':<26}{'cold p50':>11}{'cold p95':>11}{'warm p50':>11}{'warm p95':>11}{'warm ops/s':>12}")
+    for name, result in results.items():
+        cold, warm = result["cold"], result["warm"]
+        print(f"{name:<26}{cold['p50']:>9.1f}ms{cold['p95']:>9.1f}ms{warm['p50']:>9.2f}ms{warm['p95']:>9.2f}ms{result['warm_per_second']:>12.1f}")
+    for name, result in results.items():
+        if "first_token" in result:
+            first_token = result["first_token"]
+            print(f"{name + ' (streamed)':<26} time to first token p50={first_token['p50']:.1f}ms p95={first_token['p95']:.1f}ms")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        for phase in ("cold", "warm", "first_token"):
+            if phase not in result or phase not in baseline[name]:
+                continue
+            for stat in ("p50", "p95"):
+                before, after = baseline[name][phase][stat], result[phase][stat]
+                if after > before * (1 + threshold) and after - before > MIN_REGRESSION_MS:
+                    regressions.append(f"{name} {phase} {stat}: {before:.2f}ms -> {after:.2f}ms ({after / before - 1:+.0%})")
+    return regressions
+
+
+def record(names: list[str], cache_dir: str):
+    from benchmarks.fixtures import recording
+    from engine import QueryEngine
+
+    async def run():
+        engine = QueryEngine()
+        try:
+            for name in names:
+                reset_caches(cache_dir)
+                await _run_once(engine, name)
+                if name in STREAMING_ACTIONS:
+                    # Streamed again so the fixture also holds the time to first token
+                    reset_caches(cache_dir)
+                    await _time_to_first_token(engine, name)
+                print(f"  recorded {name}", file=sys.stderr)
+        finally:
+            engine.close()
+
+    with recording():
+        asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("actions", nargs="*", help="actions to run (default: all, plus 'parse')")
+    parser.add_argument("--cold", type=int, default=5, help="cold iterations per action")
+    parser.add_argument("--warm", type=int, default=50, help="warm iterations per action")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded response times (0 to skip)")
+    parser.add_argument("--strict", action="store_true", help="fail on requests with no recording instead of synthesizing")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="saved results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slowdown flagged as a regression")
+    parser.add_argument("--record", action="store_true", help="record fixtures from the live services instead of benchmarking")
+    args = parser.parse_args()
+
+    names = args.actions or list(ACTION_INTENTS) + ["parse"]
+    # Before the app is imported, so its caches land in a scratch directory
+    cache_dir = tempfile.mkdtemp(prefix="chat-nba-bench-")
+    os.environ["CHAT_NBA_CACHE_DIR"] = cache_dir
+    os.environ.pop("CHAT_NBA_OFFLINE", None)
+    if not args.record:
+        os.environ.setdefault("OPENAI_API_KEY", "replayed")
+
+    try:
+        if args.record:
+            record(names, cache_dir)
+            return
+
+        from benchmarks.fixtures import replaying
+
+        with replaying(latency_scale=args.latency_scale, synthetic=not args.strict) as served:
+            results = asyncio.run(benchmark(names, cache_dir, args.cold, args.warm))
+        print(f"responses served: {served['recorded']} recorded, {served['synthetic']} synthetic", file=sys.stderr)
+        print_table(results)
+
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "latency_scale": args.latency_scale, "actions": results}, f, indent=2)
+
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+            if baseline.get("latency_scale") != args.latency_scale:
+                print(f"⚠️ Baseline was run with --latency-scale {baseline.get('latency_scale')}; cold timings are not comparable.")
+            regressions = compare(baseline["actions"], results, args.threshold)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if regressions:
+                sys.exit(1)
+            print("No regressions.")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
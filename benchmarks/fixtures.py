@@ -0,0 +1,498 @@
+"""
+Recorded stats.nba.com and OpenAI responses, and local stand-ins that serve them.
+
+Recording (needs network access and OPENAI_API_KEY) saves every response the app
+receives under benchmarks/fixtures/, along with how long it took:
+
+    with recording():
+        ...  # run actions against the live services
+
+Replaying swaps nba_http's session and the OpenAI clients for stand-ins that answer
+the same calls from those files, sleeping for the recorded latency (times
+latency_scale). Rate limiting, retries and caching run as they do live.
+Requests with no recording get a deterministic synthetic response of the right
+shape, so the suite also runs where nothing has been recorded yet.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from types import SimpleNamespace
+
+import requests
+
+import nba_http
+from nba_api.stats.endpoints import leaguedashplayerstats, leaguegamelog, leaguestandingsv3, playercareerstats, playergamelog
+from nba_api.stats.library.http import NBAStatsHTTP
+from nba_api.stats.static import players, teams
+
+from benchmarks.queries import SAMPLE_INTENTS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Latency given to synthetic responses, in milliseconds, before latency_scale
+SYNTHETIC_NBA_LATENCY_MS = 350
+SYNTHETIC_OPENAI_LATENCY_MS = 900
+SYNTHETIC_OPENAI_FIRST_TOKEN_MS = 250
+
+EASTERN_CONFERENCE = {"ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DET", "IND", "MIA", "MIL", "NYK", "ORL", "PHI", "TOR", "WAS"}
+
+ENDPOINT_CLASSES = {
+    "leaguedashplayerstats": leaguedashplayerstats.LeagueDashPlayerStats,
+    "leaguestandingsv3": leaguestandingsv3.LeagueStandingsV3,
+    "leaguegamelog": leaguegamelog.LeagueGameLog,
+    "playergamelog": playergamelog.PlayerGameLog,
+    "playercareerstats": playercareerstats.PlayerCareerStats,
+}
+
+
+class FixtureMissing(Exception):
+    pass
+
+
+def fixture_path(kind: str, payload: dict) -> str:
+    key = json.dumps(payload, sort_keys=True, default=str)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(FIXTURES_DIR, kind, f"{digest}.json")
+
+
+def _nba_payload(endpoint: str, parameters: dict) -> dict:
+    return {"endpoint": endpoint, "parameters": parameters}
+
+
+def _openai_payload(kwargs: dict) -> dict:
+    return {"model": kwargs.get("model"), "messages": kwargs.get("messages")}
+
+
+def _save(path: str, record: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+
+
+def _load(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- Synthetic stats.nba.com responses ---
+
+@lru_cache(maxsize=64)
+def _season_league(season: str, season_type: str) -> list[dict]:
+    """
+    Per-game lines for every active player, the same for every endpoint asking
+    about this season so league stats, game logs and careers agree.
+    """
+    rng = random.Random(f"{season}|{season_type}")
+    team_list = teams.get_teams()
+    playoffs = season_type == "Playoffs"
+    league = []
+    for player in sorted(players.get_active_players(), key=lambda p: p["id"]):
+        team = rng.choice(team_list)
+        games = rng.randint(4, 20) if playoffs else rng.randint(10, 82)
+        fga = rng.uniform(2, 21)
+        fg_pct = rng.uniform(0.38, 0.6)
+        fg3a = rng.uniform(0, fga * 0.55)
+        fg3_pct = rng.uniform(0.28, 0.43)
+        fta = rng.uniform(0.3, 9)
+        ft_pct = rng.uniform(0.6, 0.92)
+        fgm, fg3m, ftm = fga * fg_pct, fg3a * fg3_pct, fta * ft_pct
+        oreb = rng.uniform(0.1, 3.5)
+        dreb = rng.uniform(0.8, 9.5)
+        league.append({
+            "player": player, "team": team, "GP": games, "MIN": rng.uniform(8, 37),
+            "FGM": fgm, "FGA": fga, "FG3M": fg3m, "FG3A": fg3a, "FTM": ftm, "FTA": fta,
+            "OREB": oreb, "DREB": dreb, "REB": oreb + dreb,
+            "AST": rng.uniform(0.3, 10.5), "TOV": rng.uniform(0.3, 4), "STL": rng.uniform(0.1, 2),
+            "BLK": rng.uniform(0, 2.5), "PF": rng.uniform(0.8, 3.5),
+            "PTS": 2 * fgm + fg3m + ftm, "PLUS_MINUS": rng.uniform(-6, 8),
+        })
+    return league
+
+
+COUNTING_STATS = ["MIN", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA", "OREB", "DREB", "REB", "AST", "TOV", "STL", "BLK", "PF", "PTS", "PLUS_MINUS"]
+
+
+def _stat_values(line: dict, per_game: bool) -> dict:
+    games = line["GP"]
+    values = {"GP": games}
+    for stat in COUNTING_STATS:
+        values[stat] = round(line[stat], 1) if per_game else round(line[stat] * games)
+    for made, attempted, pct in (("FGM", "FGA", "FG_PCT"), ("FG3M", "FG3A", "FG3_PCT"), ("FTM", "FTA", "FT_PCT")):
+        values[pct] = round(line[made] / line[attempted], 3) if line[attempted] else 0.0
+    return values
+
+
+def _result_set(name: str, headers: list[str], rows: list[dict]) -> dict:
+    return {"name": name, "headers": headers, "rowSet": [[row.get(header) for header in headers] for row in rows]}
+
+
+def _league_player_rows(parameters: dict) -> list[dict]:
+    season = parameters.get("Season")
+    per_game = parameters.get("PerMode") == "PerGame"
+    rows = []
+    for line in _season_league(season, parameters.get("SeasonType", "Regular Season")):
+        team_id = parameters.get("TeamID")
+        if team_id not in (None, "", "0", 0) and int(team_id) != line["team"]["id"]:
+            continue
+        rows.append({
+            "PLAYER_ID": line["player"]["id"],
+            "PLAYER_NAME": line["player"]["full_name"],
+            "TEAM_ID": line["team"]["id"],
+            "TEAM_ABBREVIATION": line["team"]["abbreviation"],
+            **_stat_values(line, per_game),
+        })
+    return rows
+
+
+def _standings_rows(parameters: dict) -> list[dict]:
+    rng = random.Random(f"standings|{parameters.get('Season')}")
+    rows = []
+    for team in teams.get_teams():
+        wins = rng.randint(15, 64)
+        losses = 82 - wins
+        conference_wins = rng.randint(max(0, wins - 30), min(52, wins))
+        rows.append({
+            "LeagueID": "00", "SeasonID": f"2{parameters.get('Season', '')[:4]}",
+            "TeamID": team["id"], "TeamCity": team["city"], "TeamName": team["nickname"],
+            "TeamSlug": team["nickname"].lower().replace(" ", "-"),
+            "Conference": "East" if team["abbreviation"] in EASTERN_CONFERENCE else "West",
+            "ConferenceRecord": f"{conference_wins}-{52 - conference_wins}",
+            "WINS": wins, "LOSSES": losses, "WinPCT": round(wins / 82, 3), "Record": f"{wins}-{losses}",
+        })
+    for conference in ("East", "West"):
+        ranked = sorted((row for row in rows if row["Conference"] == conference), key=lambda row: -row["WinPCT"])
+        leader = ranked[0]
+        for rank, row in enumerate(ranked, start=1):
+            row["PlayoffRank"] = rank
+            row["ConferenceGamesBack"] = ((leader["WINS"] - row["WINS"]) + (row["LOSSES"] - leader["LOSSES"])) / 2
+    return rows
+
+
+def _game_rows(line: dict, season: str, rng: random.Random) -> list[dict]:
+    team_list = [team for team in teams.get_teams() if team["id"] != line["team"]["id"]]
+    start = date(int(season[:4]), 10, 24)
+    rows = []
+    for game in range(line["GP"]):
+        opponent = rng.choice(team_list)
+        home = rng.random() < 0.5
+        game_line = {stat: max(0.0, rng.gauss(line[stat], line[stat] * 0.35)) for stat in COUNTING_STATS}
+        game_line.update(GP=1, FGA=max(game_line["FGA"], game_line["FGM"]), FG3A=max(game_line["FG3A"], game_line["FG3M"]), FTA=max(game_line["FTA"], game_line["FTM"]))
+        rows.append({
+            "SEASON_ID": f"2{season[:4]}",
+            "Player_ID": line["player"]["id"],
+            "Game_ID": f"002{season[2:4]}{game + 1:05d}",
+            "GAME_DATE": (start + timedelta(days=2 * game)).strftime("%b %d, %Y").upper(),
+            "MATCHUP": f"{line['team']['abbreviation']} {'vs.' if home else '@'} {opponent['abbreviation']}",
+            "WL": rng.choice("WL"),
+            **_stat_values(game_line, per_game=False),
+        })
+    rows.reverse()  # Most recent first, like the real endpoint
+    return rows
+
+
+def _player_line(player_id: int, season: str, season_type: str) -> dict | None:
+    return next((line for line in _season_league(season, season_type) if line["player"]["id"] == player_id), None)
+
+
+def _game_log_rows(parameters: dict) -> list[dict]:
+    season = parameters.get("Season")
+    season_type = parameters.get("SeasonType", "Regular Season")
+    line = _player_line(int(parameters.get("PlayerID")), season, season_type)
+    if line is None:
+        return []
+    rows = _game_rows(line, season, random.Random(f"games|{line['player']['id']}|{season}|{season_type}"))
+    return _played_between(rows, parameters, "%b %d, %Y")
+
+
+def _played_between(rows: list[dict], parameters: dict, date_format: str) -> list[dict]:
+    # Only games played by today, filtered to DateFrom/DateTo ("MM/DD/YYYY") like the real endpoints
+    first = datetime.strptime(parameters["DateFrom"], "%m/%d/%Y").date() if parameters.get("DateFrom") else date.min
+    last = datetime.strptime(parameters["DateTo"], "%m/%d/%Y").date() if parameters.get("DateTo") else date.today()
+    return [row for row in rows if first <= datetime.strptime(row["GAME_DATE"], date_format).date() <= min(last, date.today())]
+
+
+def _league_game_rows(parameters: dict) -> list[dict]:
+    # The same games as each player's PlayerGameLog, with ISO dates like LeagueGameLog
+    season = parameters.get("Season")
+    season_type = parameters.get("SeasonType", "Regular Season")
+    rows = []
+    for line in _season_league(season, season_type):
+        for row in _game_rows(line, season, random.Random(f"games|{line['player']['id']}|{season}|{season_type}")):
+            row = {key: value for key, value in row.items() if key not in ("Player_ID", "Game_ID")}
+            row.update(
+                PLAYER_ID=line["player"]["id"], PLAYER_NAME=line["player"]["full_name"],
+                TEAM_ID=line["team"]["id"], TEAM_ABBREVIATION=line["team"]["abbreviation"], TEAM_NAME=line["team"]["full_name"],
+                GAME_ID=f"002{season[2:4]}{len(rows):05d}",
+                GAME_DATE=datetime.strptime(row["GAME_DATE"], "%b %d, %Y").strftime("%Y-%m-%d"),
+            )
+            rows.append(row)
+    rows.sort(key=lambda row: row["GAME_DATE"])
+    return _played_between(rows, parameters, "%Y-%m-%d")
+
+
+def _career_rows(parameters: dict) -> list[dict]:
+    player_id = int(parameters.get("PlayerID"))
+    per_game = parameters.get("PerMode") == "PerGame"
+    last_year = date.today().year - (0 if date.today().month >= 7 else 1)
+    rows = []
+    for year in range(last_year - 9, last_year + 1):
+        season = f"{year}-{str(year + 1)[-2:]}"
+        line = _player_line(player_id, season, "Regular Season")
+        if line is None:
+            continue
+        rows.append({
+            "PLAYER_ID": player_id, "SEASON_ID": season, "LEAGUE_ID": "00",
+            "TEAM_ID": line["team"]["id"], "TEAM_ABBREVIATION": line["team"]["abbreviation"],
+            **_stat_values(line, per_game),
+        })
+    return rows
+
+
+SYNTHETIC_ROWS = {
+    # endpoint -> (result set filled with rows, parameters -> rows)
+    "leaguedashplayerstats": ("LeagueDashPlayerStats", _league_player_rows),
+    "leaguestandingsv3": ("Standings", _standings_rows),
+    "playergamelog": ("PlayerGameLog", _game_log_rows),
+    "leaguegamelog": ("LeagueGameLog", _league_game_rows),
+    "playercareerstats": ("SeasonTotalsRegularSeason", _career_rows),
+}
+
+
+# Result sets whose headers differ from the endpoint's expected_data
+SYNTHETIC_HEADERS = {
+    # Player mode (PlayerOrTeam=P) adds the player columns nba_api's team-mode headers lack
+    "leaguegamelog": {"LeagueGameLog": [
+        "SEASON_ID", "PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION", "TEAM_NAME", "GAME_ID", "GAME_DATE",
+        "MATCHUP", "WL", "MIN", "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT", "OREB",
+        "DREB", "REB", "AST", "STL", "BLK", "TOV", "PF", "PTS", "PLUS_MINUS", "FANTASY_PTS", "VIDEO_AVAILABLE",
+    ]},
+}
+
+
+def synthetic_nba_response(endpoint: str, parameters: dict) -> str:
+    # Built once per request, so generating the data is not timed as the response's latency
+    return _synthetic_nba_response(endpoint, json.dumps(parameters, sort_keys=True))
+
+
+@lru_cache(maxsize=256)
+def _synthetic_nba_response(endpoint: str, parameters_json: str) -> str:
+    parameters = json.loads(parameters_json)
+    if endpoint not in SYNTHETIC_ROWS:
+        raise FixtureMissing(f"No recording or synthetic data for {endpoint}.")
+    filled_set, build_rows = SYNTHETIC_ROWS[endpoint]
+    rows = build_rows(parameters)
+    # Every result set the endpoint expects must exist, even if empty. The filled one
+    # comes first, as it does from stats.nba.com, since callers take get_data_frames()[0]
+    expected = {**ENDPOINT_CLASSES[endpoint].expected_data, **SYNTHETIC_HEADERS.get(endpoint, {})}
+    result_sets = [_result_set(filled_set, expected[filled_set], rows)] + [
+        _result_set(name, headers, []) for name, headers in expected.items() if name != filled_set
+    ]
+    return json.dumps({"resource": endpoint, "parameters": parameters, "resultSets": result_sets})
+
+
+def synthetic_openai_content(kwargs: dict) -> str:
+    prompt = kwargs["messages"][-1]["content"]
+    if '"action"' in prompt:
+        # The intent parsing prompt: sample questions get the intent GPT gives them,
+        # anything else is treated as a historical question
+        question = prompt.rsplit("User: ", 1)[-1].rsplit("\nOutput:", 1)[0].strip()
+        intent = SAMPLE_INTENTS.get(question, {"action": "get_historical_nba_fact", "original_question": question})
+        return json.dumps(intent)
+    return "Synthetic stand-in answer. " * 40
+
+
+# --- Stand-ins ---
+
+class StoredResponse:
+    def __init__(self, record: dict):
+        self.status_code = record["status_code"]
+        self.text = record["text"]
+        self.content = record["text"].encode("utf-8")
+        self.url = record["url"]
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} (recorded)", response=self)
+
+
+class StandInSession:
+    """
+    Takes the place of nba_http's requests.Session, so the rate limiter, semaphore
+    and retries still run but responses come from respond(endpoint, parameters).
+    """
+    def __init__(self, respond):
+        self.respond = respond
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        endpoint = url.rstrip("/").rsplit("/", 1)[-1]
+        return self.respond(endpoint, dict(params or []))
+
+
+def _client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _completion(content: str, usage: dict | None):
+    message = SimpleNamespace(content=content, role="assistant")
+    usage = usage or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=SimpleNamespace(**usage))
+
+
+def _chunk(content: str | None, usage: dict | None = None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if content is not None else []
+    return SimpleNamespace(choices=choices, usage=SimpleNamespace(**usage) if usage else None)
+
+
+async def _stream_chunks(record: dict, latency_scale: float):
+    # The first piece arrives after the recorded time to first token, the rest spread over the remainder
+    pieces = re.findall(r"\S+\s*|\s+", record["content"]) or [""]
+    first_token_ms = record.get("first_token_ms", record["elapsed_ms"] * 0.25)
+    gap_ms = max(0.0, record["elapsed_ms"] - first_token_ms) / len(pieces)
+    await asyncio.sleep(first_token_ms * latency_scale / 1000)
+    for position, piece in enumerate(pieces):
+        if position:
+            await asyncio.sleep(gap_ms * latency_scale / 1000)
+        yield _chunk(piece)
+    yield _chunk(None, record["usage"])
+
+
+@contextmanager
+def _patched(session, client, async_client):
+    import openai_helper
+
+    real = nba_http._session, openai_helper._client, openai_helper._async_client
+    nba_http._session, openai_helper._client, openai_helper._async_client = session, client, async_client
+    try:
+        yield
+    finally:
+        nba_http._session, openai_helper._client, openai_helper._async_client = real
+
+
+# --- Recording ---
+
+@contextmanager
+def recording():
+    import openai_helper
+
+    real_session = nba_http.get_session()
+    real_client, real_async_client = openai_helper.get_client(), openai_helper.get_async_client()
+
+    def respond(endpoint, parameters):
+        start = time.perf_counter()
+        response = real_session.get(NBAStatsHTTP.base_url.format(endpoint=endpoint), params=sorted(parameters.items()), timeout=nba_http.REQUEST_TIMEOUT)
+        record = {
+            **_nba_payload(endpoint, parameters),
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+            "status_code": response.status_code,
+            "url": response.url,
+            "text": response.text,
+        }
+        if response.status_code == 200:
+            _save(fixture_path("nba", _nba_payload(endpoint, parameters)), record)
+        return response
+
+    def save_completion(kwargs, content, usage, elapsed_ms, first_token_ms=None):
+        record = {
+            **_openai_payload(kwargs),
+            "elapsed_ms": elapsed_ms,
+            "content": content,
+            "usage": usage.model_dump() if usage is not None else None,
+        }
+        if first_token_ms is not None:
+            record["first_token_ms"] = first_token_ms
+        _save(fixture_path("openai", _openai_payload(kwargs)), record)
+
+    async def record_stream(kwargs, stream, start):
+        parts, usage, first_token_ms = [], None, None
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                parts.append(chunk.choices[0].delta.content)
+            yield chunk
+        save_completion(kwargs, "".join(parts), usage, (time.perf_counter() - start) * 1000, first_token_ms)
+
+    def create(**kwargs):
+        start = time.perf_counter()
+        response = real_client.chat.completions.create(**kwargs)
+        save_completion(kwargs, response.choices[0].message.content, response.usage, (time.perf_counter() - start) * 1000)
+        return response
+
+    async def create_async(**kwargs):
+        start = time.perf_counter()
+        response = await real_async_client.chat.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return record_stream(kwargs, response, start)
+        save_completion(kwargs, response.choices[0].message.content, response.usage, (time.perf_counter() - start) * 1000)
+        return response
+
+    with _patched(StandInSession(respond), _client(create), _client(create_async)):
+        yield
+
+
+# --- Replay ---
+
+@contextmanager
+def replaying(latency_scale: float = 1.0, synthetic: bool = True):
+    """
+    Serves stats.nba.com and OpenAI calls from recorded fixtures. Counts of
+    recorded and synthetic responses served are kept in the yielded dict.
+    """
+    served = {"recorded": 0, "synthetic": 0}
+
+    def nba_record(endpoint, parameters) -> dict:
+        record = _load(fixture_path("nba", _nba_payload(endpoint, parameters)))
+        if record is not None:
+            served["recorded"] += 1
+            return record
+        if not synthetic:
+            raise FixtureMissing(f"No recording for {endpoint} {parameters}.")
+        served["synthetic"] += 1
+        return {"elapsed_ms": SYNTHETIC_NBA_LATENCY_MS, "status_code": 200, "url": endpoint, "text": synthetic_nba_response(endpoint, parameters)}
+
+    def completion_record(kwargs) -> dict:
+        record = _load(fixture_path("openai", _openai_payload(kwargs)))
+        if record is not None:
+            served["recorded"] += 1
+            return record
+        if not synthetic:
+            raise FixtureMissing(f"No recording for {kwargs.get('model')} prompt.")
+        served["synthetic"] += 1
+        return {
+            "elapsed_ms": SYNTHETIC_OPENAI_LATENCY_MS,
+            "first_token_ms": SYNTHETIC_OPENAI_FIRST_TOKEN_MS,
+            "content": synthetic_openai_content(kwargs),
+            "usage": None,
+        }
+
+    def respond(endpoint, parameters):
+        record = nba_record(endpoint, parameters)
+        time.sleep(record["elapsed_ms"] * latency_scale / 1000)
+        return StoredResponse(record)
+
+    def create(**kwargs):
+        record = completion_record(kwargs)
+        time.sleep(record["elapsed_ms"] * latency_scale / 1000)
+        return _completion(record["content"], record["usage"])
+
+    async def create_async(**kwargs):
+        record = completion_record(kwargs)
+        if kwargs.get("stream"):
+            return _stream_chunks(record, latency_scale)
+        await asyncio.sleep(record["elapsed_ms"] * latency_scale / 1000)
+        return _completion(record["content"], record["usage"])
+
+    with _patched(StandInSession(respond), _client(create), _client(create_async)):
+        yield served
@@ -0,0 +1,68 @@
+"""
+Compares the local rule-based parser with the GPT parser on the sample questions.
+
+    python -m benchmarks.intent_parser          # local parser only
+    python -m benchmarks.intent_parser --llm    # also time parse_query_with_gpt (needs OPENAI_API_KEY)
+"""
+import argparse
+import time
+
+from benchmarks.queries import SAMPLE_INTENTS, SAMPLE_QUERIES
+from benchmarks.timing import percentile, summarize
+from intent_parser import parse_query_locally
+
+
+def _report(label: str, samples: list[float]):
+    summary = summarize(samples)
+    print(f"{label:<8} n={summary['n']:<4} p50={summary['p50']:9.3f} ms  "
+          f"p95={summary['p95']:9.3f} ms  mean={summary['mean']:9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="also time parse_query_with_gpt")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the sample questions for the local parser")
+    args = parser.parse_args()
+
+    # First call builds the player and team indexes; report it separately
+    start = time.perf_counter()
+    parse_query_locally(SAMPLE_QUERIES[0])
+    print(f"index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    hits = 0
+    wrong = 0
+    local_samples = []
+    for query in SAMPLE_QUERIES:
+        intent = parse_query_locally(query)
+        if intent is None:
+            print(f"  falls back to LLM: {query}")
+            continue
+        hits += 1
+        # A confident local parse must pick the action GPT would
+        expected = SAMPLE_INTENTS[query]["action"]
+        if intent.get("action") != expected:
+            wrong += 1
+            print(f"  wrong action ({intent.get('action')}, expected {expected}): {query}")
+    for _ in range(args.repeat):
+        for query in SAMPLE_QUERIES:
+            start = time.perf_counter()
+            parse_query_locally(query)
+            local_samples.append((time.perf_counter() - start) * 1000)
+
+    print(f"local hit rate: {hits}/{len(SAMPLE_QUERIES)} ({hits / len(SAMPLE_QUERIES):.0%}), {wrong} with the wrong action")
+    _report("local", local_samples)
+
+    if args.llm:
+        from openai_helper import parse_query_with_gpt
+
+        llm_samples = []
+        for query in SAMPLE_QUERIES:
+            start = time.perf_counter()
+            parse_query_with_gpt(query)
+            llm_samples.append((time.perf_counter() - start) * 1000)
+        _report("llm", llm_samples)
+        print(f"speedup at p50: {percentile(llm_samples, 50) / percentile(local_samples, 50):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
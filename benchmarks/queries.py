@@ -0,0 +1,109 @@
+# Questions taken from the README and the GPT prompt's examples
+SAMPLE_QUERIES = [
+    "Who led the league in assists last season?",
+    "Who led the league in rebounds last season?",
+    "Top 10 players in 3PT% this season",
+    "Top 5 in 3PT% this season?",
+    "Who has the most steals in the playoffs this year?",
+    "Top 3 in rebounds regular season 2022-23",
+    "who has the most free throw attempts in the nba playoffs right now?",
+    "Show me Steph Curry's points per game over the last 3 seasons",
+    "show me LeBron James' points per game over the last 5 years",
+    "LeBron James assists per game last 2 years",
+    "Compare LeBron James and Kevin Durant in points, assists, and rebounds this season",
+    "Compare Jayson Tatum and Jimmy Butler in points per game and rebounds this season per game",
+    "Compare Joel Embiid and Nikola Jokic in points, rebounds, and assists last season",
+    "Who leads the Warriors in scoring this season?",
+    "Who is the 76ers leader in blocks last season?",
+    "What's the Lakers' record this season?",
+    "Celtics record 2022-23",
+    "Records of the Lakers, Celtics and Knicks this season",
+    "Western Conference standings",
+    "How many games back are the Knicks?",
+    "What does PER mean?",
+    "Explain True Shooting Percentage",
+    "Tell me about usage rate",
+    "What's the league average for 3PT% this season?",
+    "League average for points per game last season",
+    "Average steals in the playoffs this year?",
+    "Show me Devin Booker's last 5 games",
+    "LeBron James last 3 games this season",
+    "Stephen Curry game log last 2 playoff games this season",
+    "Compare Stephen Curry's points and 3PT% to the league average in 2023-24",
+    "Where does Jalen Brunson rank in assists per game in 2023-24?",
+    "Best scoring games of the last week",
+    "Who scored 40+ against the Celtics this season?",
+    "Who has the most 40 point games against the Celtics",
+    "Who has the most 30+ point games against the Lakers this season?",
+    "How many times has anyone scored 40 against the Knicks this season?",
+    "How does Jayson Tatum play against the Knicks this season?",
+    "how many teams have come back from 3-1 down in the playoffs?",
+]
+
+
+# What the GPT parser returns for each sample question, in the shape of the prompt's
+# examples. The synthetic OpenAI stand-in answers with these, so parse timings and the
+# LLM fallback path run on realistic intents when nothing is recorded.
+SAMPLE_INTENTS = {
+    "Who led the league in assists last season?": {"action": "get_stat_leader", "stat": "assists", "season": "2023-24"},
+    "Who led the league in rebounds last season?": {"action": "get_stat_leader", "stat": "rebounds", "season": "2023-24"},
+    "Top 10 players in 3PT% this season": {"action": "get_top_players", "stat": "3PT%", "season": "2024-25", "limit": 10},
+    "Top 5 in 3PT% this season?": {"action": "get_top_players", "stat": "3PT%", "season": "2024-25", "limit": 5},
+    "Who has the most steals in the playoffs this year?": {"action": "get_top_players", "stat": "steals", "season": "2024-25", "limit": 5, "season_type": "Playoffs"},
+    "Top 3 in rebounds regular season 2022-23": {"action": "get_top_players", "stat": "rebounds", "season": "2022-23", "limit": 3},
+    "who has the most free throw attempts in the nba playoffs right now?": {"action": "get_top_players", "stat": "free throw attempts", "season": "2024-25", "limit": 5, "season_type": "Playoffs"},
+    "Show me Steph Curry's points per game over the last 3 seasons": {"action": "get_player_stats", "player": "Stephen Curry", "stat": "points_per_game", "range": "last 3 seasons"},
+    "show me LeBron James' points per game over the last 5 years": {"action": "get_player_stats", "player": "LeBron James", "stat": "points_per_game", "range": "last 5 years"},
+    "LeBron James assists per game last 2 years": {"action": "get_player_stats", "player": "LeBron James", "stat": "assists_per_game", "range": "last 2 years"},
+    "Compare LeBron James and Kevin Durant in points, assists, and rebounds this season": {"action": "compare_players", "players": ["LeBron James", "Kevin Durant"], "stats": ["points", "assists", "rebounds"], "season": "2024-25"},
+    "Compare Jayson Tatum and Jimmy Butler in points per game and rebounds this season per game": {"action": "compare_players", "players": ["Jayson Tatum", "Jimmy Butler"], "stats": ["points", "rebounds"], "season": "2024-25", "per_game": True},
+    "Compare Joel Embiid and Nikola Jokic in points, rebounds, and assists last season": {"action": "compare_players", "players": ["Joel Embiid", "Nikola Jokic"], "stats": ["points", "rebounds", "assists"], "season": "2023-24"},
+    "Who leads the Warriors in scoring this season?": {"action": "get_team_leader", "team_name": "Warriors", "stat_name": "points", "season": "2024-25"},
+    "Who is the 76ers leader in blocks last season?": {"action": "get_team_leader", "team_name": "76ers", "stat_name": "blocks", "season": "2023-24"},
+    "What's the Lakers' record this season?": {"action": "get_team_record", "team_name": "Lakers", "season": "2024-25"},
+    "Celtics record 2022-23": {"action": "get_team_record", "team_name": "Celtics", "season": "2022-23"},
+    "Records of the Lakers, Celtics and Knicks this season": {"action": "get_team_records", "team_names": ["Lakers", "Celtics", "Knicks"], "season": "2024-25"},
+    "Western Conference standings": {"action": "get_conference_standings", "conference": "West", "season": "2024-25"},
+    "How many games back are the Knicks?": {"action": "get_games_back", "team_name": "Knicks", "season": "2024-25"},
+    "What does PER mean?": {"action": "explain_stat", "stat_name": "PER"},
+    "Explain True Shooting Percentage": {"action": "explain_stat", "stat_name": "True Shooting Percentage"},
+    "Tell me about usage rate": {"action": "explain_stat", "stat_name": "usage rate"},
+    "What's the league average for 3PT% this season?": {"action": "get_league_average", "stat_name": "3PT%", "season": "2024-25"},
+    "League average for points per game last season": {"action": "get_league_average", "stat_name": "points per game", "season": "2023-24"},
+    "Average steals in the playoffs this year?": {"action": "get_league_average", "stat_name": "steals", "season": "2024-25", "season_type": "Playoffs"},
+    "Show me Devin Booker's last 5 games": {"action": "get_player_game_log", "player_name": "Devin Booker", "limit": 5},
+    "LeBron James last 3 games this season": {"action": "get_player_game_log", "player_name": "LeBron James", "season": "2024-25", "limit": 3},
+    "Stephen Curry game log last 2 playoff games this season": {"action": "get_player_game_log", "player_name": "Stephen Curry", "season": "2024-25", "limit": 2, "season_type": "Playoffs"},
+    "Compare Stephen Curry's points and 3PT% to the league average in 2023-24": {"action": "compare_to_league_average", "player_name": "Stephen Curry", "stats": ["points", "3PT%"], "season": "2023-24"},
+    "Where does Jalen Brunson rank in assists per game in 2023-24?": {"action": "get_player_rank", "player_name": "Jalen Brunson", "stats": ["assists"], "season": "2023-24", "per_mode": "PerGame"},
+    "Best scoring games of the last week": {"action": "get_best_games", "stat": "points", "date_range": "last week", "limit": 10},
+    "Who scored 40+ against the Celtics this season?": {"action": "get_games_against", "team_name": "Celtics", "stat": "points", "minimum": 40, "season": "2024-25"},
+    "Who has the most 40 point games against the Celtics": {"action": "get_games_against", "team_name": "Celtics", "stat": "points", "minimum": 40, "season": "2024-25"},
+    "Who has the most 30+ point games against the Lakers this season?": {"action": "get_games_against", "team_name": "Lakers", "stat": "points", "minimum": 30, "season": "2024-25"},
+    "How many times has anyone scored 40 against the Knicks this season?": {"action": "get_games_against", "team_name": "Knicks", "stat": "points", "minimum": 40, "season": "2024-25"},
+    "How does Jayson Tatum play against the Knicks this season?": {"action": "get_head_to_head", "player_name": "Jayson Tatum", "team_name": "Knicks", "season": "2024-25"},
+    "how many teams have come back from 3-1 down in the playoffs?": {"action": "get_historical_nba_fact", "original_question": "how many teams have come back from 3-1 down in the playoffs?"},
+}
+
+# One intent per action, run directly so action timings leave out parsing.
+# Seasons are fixed so recorded fixtures keep matching.
+ACTION_INTENTS = {
+    "get_top_players": {"action": "get_top_players", "stat": "points", "season": "2023-24", "limit": 10},
+    "get_stat_leader": {"action": "get_stat_leader", "stat": "assists", "season": "2023-24"},
+    "get_player_stats": {"action": "get_player_stats", "player": "LeBron James", "stat": "points per game", "range": "last 3 seasons"},
+    "get_team_leader": {"action": "get_team_leader", "team_name": "Warriors", "stat_name": "points", "season": "2023-24"},
+    "get_team_record": {"action": "get_team_record", "team_name": "Lakers", "season": "2023-24"},
+    "get_team_records": {"action": "get_team_records", "team_names": ["Lakers", "Celtics", "Knicks"], "season": "2023-24"},
+    "get_conference_standings": {"action": "get_conference_standings", "conference": "West", "season": "2023-24"},
+    "get_games_back": {"action": "get_games_back", "team_name": "Knicks", "season": "2023-24"},
+    "get_league_average": {"action": "get_league_average", "stat_name": "3PT%", "season": "2023-24"},
+    "compare_to_league_average": {"action": "compare_to_league_average", "player_name": "Stephen Curry", "stats": ["points", "3PT%", "assists"], "season": "2023-24"},
+    "get_player_rank": {"action": "get_player_rank", "player_name": "Jalen Brunson", "stats": [], "season": "2023-24"},
+    "get_player_game_log": {"action": "get_player_game_log", "player_name": "Devin Booker", "season": "2023-24", "limit": 5},
+    "compare_players": {"action": "compare_players", "players": ["LeBron James", "Kevin Durant"], "stats": ["points", "assists", "rebounds"], "season": "2023-24"},
+    "get_best_games": {"action": "get_best_games", "stat": "points", "date_range": "2024-03-01 to 2024-03-07", "limit": 10},
+    "get_games_against": {"action": "get_games_against", "team_name": "Celtics", "stat": "points", "minimum": 40, "season": "2023-24"},
+    "get_head_to_head": {"action": "get_head_to_head", "player_name": "Devin Booker", "team_name": "Celtics", "season": "2023-24"},
+    "explain_stat": {"action": "explain_stat", "stat_name": "clutch time net rating"},
+    "get_historical_nba_fact": {"action": "get_historical_nba_fact", "original_question": "how many teams have come back from 3-1 down in the playoffs?"},
+}
@@ -0,0 +1,146 @@
+"""
+Load test for server.py: many clients sending a mix of questions and structured
+actions at once.
+
+    python -m benchmarks.server_load                          # in-process server on the stand-in services
+    python -m benchmarks.server_load --clients 64 --max-in-flight 8
+    python -m benchmarks.server_load --url http://host:8080   # a running server (live services)
+
+The in-process server answers from the same recorded or synthetic stats.nba.com
+and OpenAI responses as benchmarks.actions, with their original latency. Caches
+start empty, so the first requests for each season pay the fetch. Run from the
+repository root.
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+from benchmarks.queries import ACTION_INTENTS, SAMPLE_QUERIES
+from benchmarks.timing import summarize
+
+
+def request_mix() -> list[tuple[str, dict]]:
+    requests = [("/query", {"question": question}) for question in SAMPLE_QUERIES]
+    for intent in ACTION_INTENTS.values():
+        fields = {key: value for key, value in intent.items() if key != "action"}
+        requests.append((f"/actions/{intent['action']}", fields))
+    return requests
+
+
+def post(url: str, body: dict, timeout: float) -> tuple[int, dict]:
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def load_test(base_url: str, clients: int, total: int, timeout: float) -> dict:
+    mix = itertools.cycle(request_mix())
+    mix_lock = threading.Lock()
+    latencies, statuses, errors = [], Counter(), Counter()
+    results_lock = threading.Lock()
+    remaining = [total]
+
+    def client():
+        while True:
+            with mix_lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+                path, body = next(mix)
+            start = time.perf_counter()
+            try:
+                status, payload = post(base_url + path, body, timeout)
+            except OSError as e:
+                status, payload = "connection error", {"error": str(e)}
+            elapsed = (time.perf_counter() - start) * 1000
+            with results_lock:
+                statuses[status] += 1
+                if status == 200:
+                    latencies.append(elapsed)
+                    if payload.get("error"):
+                        errors[payload["error"].split(":")[0]] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    return {
+        "requests": total,
+        "seconds": seconds,
+        "per_second": total / seconds if seconds else None,
+        "latency": summarize(latencies) if latencies else None,
+        "statuses": dict(statuses),
+        "errors": dict(errors),
+    }
+
+
+def print_report(report: dict):
+    print(f"{report['requests']} requests in {report['seconds']:.2f}s ({report['per_second']:.1f}/s)")
+    if report["latency"]:
+        latency = report["latency"]
+        print(f"answered: p50={latency['p50']:.1f}ms p95={latency['p95']:.1f}ms mean={latency['mean']:.1f}ms")
+    print("statuses:", ", ".join(f"{status}={n}" for status, n in sorted(report["statuses"].items(), key=str)))
+    for error, n in report["errors"].items():
+        print(f"  {n} answered with {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=500, help="requests in total")
+    parser.add_argument("--timeout", type=float, default=60, help="client-side seconds per request")
+    parser.add_argument("--max-in-flight", type=int, help="in-process server: queries answered at once")
+    parser.add_argument("--queue-seconds", type=float, help="in-process server: wait for a slot before 503")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded response times (0 to skip)")
+    args = parser.parse_args()
+
+    if args.url:
+        print_report(load_test(args.url.rstrip("/"), args.clients, args.requests, args.timeout))
+        return
+
+    # Before the app is imported, so its caches land in a scratch directory
+    cache_dir = tempfile.mkdtemp(prefix="chat-nba-load-")
+    os.environ["CHAT_NBA_CACHE_DIR"] = cache_dir
+    os.environ.pop("CHAT_NBA_OFFLINE", None)
+    os.environ.setdefault("OPENAI_API_KEY", "replayed")
+
+    from benchmarks.fixtures import replaying
+    import server
+
+    settings = {}
+    if args.max_in_flight is not None:
+        settings["max_in_flight"] = args.max_in_flight
+    if args.queue_seconds is not None:
+        settings["queue_seconds"] = args.queue_seconds
+    try:
+        with replaying(latency_scale=args.latency_scale) as served:
+            app = server.serve("127.0.0.1", 0, quiet=True, **settings)
+            try:
+                host, port = app.server_address[:2]
+                report = load_test(f"http://{host}:{port}", args.clients, args.requests, args.timeout)
+            finally:
+                server.shutdown_server(app)
+        print(f"responses served: {served['recorded']} recorded, {served['synthetic']} synthetic", file=sys.stderr)
+        print_report(report)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cold start time of the command-line entry points, each measured in a fresh interpreter.
+
+    python -m benchmarks.startup                  # fail if main.py takes over the budget to reach its prompt
+    python -m benchmarks.startup --imports        # also list the slowest imports before the prompt
+
+Run from the repository root.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.timing import summarize
+
+# Milliseconds from launching main.py to its first prompt
+DEFAULT_BUDGET_MS = 250
+
+ENV = {**os.environ, "PYTHONUNBUFFERED": "1", "NO_COLOR": "1"}
+
+
+def time_to_prompt() -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "main.py"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=ENV)
+    seen = b""
+    while not seen.endswith(b"> "):
+        chunk = process.stdout.read1(4096)
+        if not chunk:
+            raise RuntimeError(f"main.py exited before its prompt: {seen[-200:]!r}")
+        seen += chunk
+    elapsed = (time.perf_counter() - start) * 1000
+    process.communicate(b"exit\n", timeout=60)
+    return elapsed
+
+
+def time_command(args: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=ENV, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def slowest_imports(limit: int) -> list[tuple[int, str]]:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True, env=ENV)
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports.append((int(parts[1]), parts[2].strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="p50 time to main.py's prompt allowed")
+    parser.add_argument("--imports", action="store_true", help="list the slowest imports main.py makes before its prompt")
+    args = parser.parse_args()
+
+    measurements = {
+        "main.py to prompt": time_to_prompt,
+        # What main.py loads in the background, and batch.py loads up front
+        "import engine": lambda: time_command(["-c", "import engine"]),
+    }
+    results = {}
+    for label, measure in measurements.items():
+        measure()  # Warm the OS file cache and __pycache__
+        results[label] = summarize([measure() for _ in range(args.runs)])
+        summary = results[label]
+        print(f"{label:<20} p50={summary['p50']:8.1f} ms  p95={summary['p95']:8.1f} ms")
+
+    if args.imports:
+        print("slowest imports before the prompt (cumulative us):")
+        for micros, module in slowest_imports(10):
+            print(f"  {micros:>9}  {module}")
+
+    p50 = results["main.py to prompt"]["p50"]
+    if p50 > args.budget_ms:
+        print(f"OVER BUDGET: main.py took {p50:.1f} ms to reach its prompt (budget {args.budget_ms:g} ms)")
+        sys.exit(1)
+    print(f"main.py startup within budget ({p50:.1f} <= {args.budget_ms:g} ms)")
+
+
+if __name__ == "__main__":
+    main()
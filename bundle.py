@@ -0,0 +1,112 @@
+"""
+Builds a versioned offline data bundle of league-wide stats.
+
+    python bundle.py --seasons 2019-20..2023-24 --season-types "Regular Season" Playoffs
+    CHAT_NBA_OFFLINE=1 python main.py
+
+Each bundle is a directory bundles/<version>/ holding the same compact frame files
+as the stats cache plus a manifest.json listing what was fetched. With
+CHAT_NBA_OFFLINE set, stats_cache reads only from the newest bundle (or the one
+CHAT_NBA_BUNDLE points to) and never calls stats.nba.com.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import stats_cache
+from stats_cache import BUNDLES_DIR, get_league_game_log, get_league_player_stats, get_league_standings
+
+DEFAULT_SEASON_TYPES = ["Regular Season", "Playoffs"]
+DEFAULT_PER_MODES = ["Totals", "PerGame"]
+
+
+def expand_seasons(specs: list[str]) -> list[str]:
+    # "2019-20..2021-22" -> ["2019-20", "2020-21", "2021-22"]
+    seasons = []
+    for spec in specs:
+        first, _, last = spec.partition("..")
+        start = int(first[:4])
+        end = int((last or first)[:4])
+        for year in range(start, end + 1):
+            season = f"{year}-{str(year + 1)[-2:]}"
+            if season not in seasons:
+                seasons.append(season)
+    return seasons
+
+
+def build_bundle(seasons: list[str], season_types: list[str], per_modes: list[str], standings: bool, output_dir: str, version: str, game_logs: bool = True) -> str:
+    bundle_dir = os.path.join(output_dir, version)
+    if os.path.exists(os.path.join(bundle_dir, "manifest.json")):
+        raise FileExistsError(f"Bundle {bundle_dir} already exists.")
+
+    failures = []
+    stats_cache.start_recording(bundle_dir)
+    try:
+        for season in seasons:
+            for season_type in season_types:
+                for per_mode in per_modes:
+                    try:
+                        get_league_player_stats(season, season_type=season_type, per_mode=per_mode)
+                    except Exception as e:
+                        failures.append(f"leaguedashplayerstats {season} {season_type} {per_mode}: {e}")
+                if standings:
+                    try:
+                        get_league_standings(season, season_type=season_type)
+                    except Exception as e:
+                        failures.append(f"leaguestandingsv3 {season} {season_type}: {e}")
+                if game_logs:
+                    try:
+                        get_league_game_log(season, season_type=season_type)
+                    except Exception as e:
+                        failures.append(f"leaguegamelog {season} {season_type}: {e}")
+                print(f"Fetched {season} {season_type}", file=sys.stderr)
+    finally:
+        entries = stats_cache.stop_recording()
+
+    for failure in failures:
+        print(f"⚠️ {failure}", file=sys.stderr)
+    if not entries:
+        raise RuntimeError("Nothing was fetched; no bundle written.")
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seasons": seasons,
+        "season_types": season_types,
+        "per_modes": per_modes,
+        "entries": entries,
+    }
+    # Written last, so a bundle without a manifest is an unfinished build and is ignored
+    with open(os.path.join(bundle_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return bundle_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", nargs="+", required=True, help='seasons like 2023-24, or ranges like 2015-16..2023-24')
+    parser.add_argument("--season-types", nargs="+", default=DEFAULT_SEASON_TYPES)
+    parser.add_argument("--per-modes", nargs="+", default=DEFAULT_PER_MODES)
+    parser.add_argument("--no-standings", action="store_true", help="skip league standings")
+    parser.add_argument("--no-game-logs", action="store_true", help="skip league-wide game logs")
+    parser.add_argument("-o", "--output", default=BUNDLES_DIR, help="directory bundles are written under")
+    parser.add_argument("--version", help="bundle name (default: a UTC timestamp)")
+    args = parser.parse_args()
+
+    version = args.version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    bundle_dir = build_bundle(
+        expand_seasons(args.seasons),
+        args.season_types,
+        args.per_modes,
+        not args.no_standings,
+        args.output,
+        version,
+        not args.no_game_logs,
+    )
+    print(f"Wrote bundle to {bundle_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compact on-disk format for cached stats frames.
+
+Frames are written as uncompressed Arrow IPC files so they can be memory-mapped and
+read column by column. Before writing, integers are narrowed to the smallest of
+int16/int32 that holds them, floats become float32 when that loses nothing at the
+precision stats.nba.com publishes, and repeated strings (names, abbreviations)
+become categoricals. Without pyarrow installed, frames fall back to pickles.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+FRAME_SUFFIX = ".arrow" if pa is not None else ".pkl"
+
+# stats.nba.com publishes at most 3 decimals, so float32 is safe if it stays this close
+FLOAT32_TOLERANCE = 5e-5
+
+# String columns with fewer distinct values than this fraction of rows become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    compact = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            compact[col] = series
+        elif pd.api.types.is_integer_dtype(series):
+            compact[col] = _narrow_int(series)
+        elif pd.api.types.is_float_dtype(series):
+            compact[col] = _narrow_float(series)
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            non_null = series.dropna()
+            if len(non_null) and non_null.map(type).eq(str).all() and series.nunique() <= max(1, len(series) * CATEGORY_MAX_RATIO):
+                compact[col] = series.astype("category")
+            else:
+                compact[col] = series
+        else:
+            compact[col] = series
+    return pd.DataFrame(compact, index=df.index)
+
+
+def _narrow_int(series: pd.Series) -> pd.Series:
+    # int8 is skipped on purpose: W + L or GP sums would overflow it
+    if series.empty:
+        return series
+    low, high = series.min(), series.max()
+    for dtype in (np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype)
+    return series
+
+
+def _narrow_float(series: pd.Series) -> pd.Series:
+    values = series.to_numpy(dtype="float64")
+    narrowed = values.astype(np.float32)
+    if np.allclose(narrowed, values, rtol=0, atol=FLOAT32_TOLERANCE, equal_nan=True):
+        return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def write_frame(path: str, df: pd.DataFrame):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if pa is not None:
+        # Uncompressed so the file can be memory-mapped
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)  # Atomic, so readers never see a half-written file
+
+
+def read_frame(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Loads a cached frame. With columns, only those that exist in the file are read.
+    """
+    if pa is None:
+        df = pd.read_pickle(path)
+        return df if columns is None else df[[col for col in dict.fromkeys(columns) if col in df.columns]]
+
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([col for col in dict.fromkeys(columns) if col in table.column_names])
+        return table.to_pandas(split_blocks=True)
@@ -0,0 +1,273 @@
+"""
+Asyncio query engine: question -> parsed intent -> action result.
+
+GPT calls use the async OpenAI client and nba_stats functions run in a thread pool,
+so many questions can be in flight at once. The REPL in main.py is one front end.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from metrics import Trace, count, stage, tracing
+
+from nba_stats import (
+    compare_players,
+    compare_to_league_average,
+    get_best_games,
+    get_conference_standings,
+    get_games_against,
+    get_games_back,
+    get_head_to_head,
+    get_league_average_for_stat,
+    get_player_rank,
+    get_player_game_log,
+    get_player_stats_over_seasons,
+    get_team_leader,
+    get_team_record,
+    get_team_records,
+    get_top_players_by_stat,
+)
+from openai_helper import (
+    answer_historical_nba_fact_with_gpt_async,
+    get_stat_explanation_with_gpt_async,
+    parse_query_async,
+    stream_historical_nba_fact,
+    stream_stat_explanation,
+)
+
+# Seconds a single question may take, end to end
+DEFAULT_TIMEOUT = float(os.getenv("CHAT_NBA_QUERY_TIMEOUT", "30"))
+
+# Threads available for blocking nba_api calls
+DEFAULT_WORKERS = int(os.getenv("CHAT_NBA_WORKERS", "8"))
+
+
+@dataclass
+class QueryResult:
+    question: str
+    intent: dict = field(default_factory=dict)
+    output: object = None  # DataFrame, text, or None for unknown actions
+    error: str | None = None
+    trace: Trace | None = None
+
+
+# action -> (nba_stats function, intent -> keyword arguments)
+STATS_ACTIONS = {
+    "get_top_players": (get_top_players_by_stat, lambda r: {
+        "stat_name": r.get("stat", ""),
+        "season": r.get("season", ""),
+        "limit": r.get("limit", 5),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    # Alias for get_top_players with limit=1
+    "get_stat_leader": (get_top_players_by_stat, lambda r: {
+        "stat_name": r.get("stat", ""),
+        "season": r.get("season", ""),
+        "limit": 1,
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    "get_player_stats": (get_player_stats_over_seasons, lambda r: {
+        "player_name": r.get("player", ""),
+        "stat_name": r.get("stat", ""),
+        "season_range": r.get("range", ""),
+    }),
+    "get_team_leader": (get_team_leader, lambda r: {
+        "team_name": r.get("team_name", ""),
+        "stat_name": r.get("stat_name", ""),
+        "season": r.get("season", ""),
+    }),
+    "get_team_record": (get_team_record, lambda r: {
+        "team_name": r.get("team_name", ""),
+        "season": r.get("season", ""),
+    }),
+    # Answered from the same standings snapshot as get_team_record
+    "get_team_records": (get_team_records, lambda r: {
+        "team_names": r.get("team_names", []),
+        "season": r.get("season", ""),
+    }),
+    "get_conference_standings": (get_conference_standings, lambda r: {
+        "conference": r.get("conference", ""),
+        "season": r.get("season", ""),
+    }),
+    "get_games_back": (get_games_back, lambda r: {
+        "team_name": r.get("team_name", ""),
+        "season": r.get("season", ""),
+    }),
+    "get_league_average": (get_league_average_for_stat, lambda r: {
+        "stat_name": r.get("stat_name", ""),
+        "season": r.get("season", ""),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    "compare_to_league_average": (compare_to_league_average, lambda r: {
+        "player_name": r.get("player_name", ""),
+        "stat_names": r.get("stats", []),
+        "season": r.get("season", ""),
+        "per_mode": r.get("per_mode", "PerGame"),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    "get_player_rank": (get_player_rank, lambda r: {
+        "player_name": r.get("player_name", ""),
+        "season": r.get("season", ""),
+        "stat_names": r.get("stats", []),
+        "per_mode": r.get("per_mode", "Totals"),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    "get_player_game_log": (get_player_game_log, lambda r: {
+        "player_name": r.get("player_name", ""),
+        "season": r.get("season", ""),
+        "limit": r.get("limit", 5),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    "compare_players": (compare_players, lambda r: {
+        "player_names": r.get("players", []),
+        "stat_names": r.get("stats", []),
+        "season": r.get("seasons") or r.get("season", ""),
+        "per_game": r.get("per_game", False),
+        "per_mode": r.get("per_mode"),
+    }),
+    # Answered from the league-wide game log of a season
+    "get_best_games": (get_best_games, lambda r: {
+        "stat_name": r.get("stat", "points"),
+        "season": r.get("season", ""),
+        "date_range": r.get("date_range", ""),
+        "limit": r.get("limit", 10),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    "get_games_against": (get_games_against, lambda r: {
+        "team_name": r.get("team_name", ""),
+        "season": r.get("season", ""),
+        "stat_name": r.get("stat", "points"),
+        "minimum": r.get("minimum", 40),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+    "get_head_to_head": (get_head_to_head, lambda r: {
+        "player_name": r.get("player_name", ""),
+        "team_name": r.get("team_name", ""),
+        "season": r.get("season", ""),
+        "season_type": r.get("season_type", "Regular Season"),
+    }),
+}
+
+
+class QueryEngine:
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nba-stats")
+
+    async def parse(self, question: str) -> dict:
+        with stage("parse"):
+            return await parse_query_async(question)
+
+    async def run_action(self, intent: dict, stream: bool = False):
+        """
+        With stream=True, GPT-written answers come back as an async iterator of text
+        pieces instead of a string; the GPT call runs as the iterator is consumed.
+        """
+        with stage(f"action.{intent.get('action')}"):
+            return await self._run_action(intent, stream)
+
+    async def _run_action(self, intent: dict, stream: bool):
+        action = intent.get("action")
+
+        if action in STATS_ACTIONS:
+            function, build_kwargs = STATS_ACTIONS[action]
+            kwargs = build_kwargs(intent)
+            loop = asyncio.get_running_loop()
+            # Run in a copy of this context so the thread records onto the query's trace
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self.executor, functools.partial(context.run, function, **kwargs))
+
+        if action == "explain_stat":
+            stat_to_explain = intent.get("stat_name", "")
+            if not stat_to_explain:
+                return "❌ Could not determine which stat to explain."
+            if stream:
+                return stream_stat_explanation(stat_to_explain)
+            return await get_stat_explanation_with_gpt_async(stat_to_explain)
+
+        if action == "get_historical_nba_fact":
+            if stream:
+                return stream_historical_nba_fact(intent)
+            return await answer_historical_nba_fact_with_gpt_async(intent)
+
+        return None
+
+    async def _answer(self, question: str, result: QueryResult, stream: bool) -> QueryResult:
+        result.intent = await self.parse(question)
+        result.output = await self.run_action(result.intent, stream)
+        return result
+
+    async def answer(self, question: str, timeout: float | None = None, stream: bool = False) -> QueryResult:
+        """
+        Parses and answers one question. Errors and timeouts come back on
+        QueryResult.error instead of raising; cancelling the caller cancels the query.
+        A stats call already running in the thread pool finishes in the background
+        and its result is dropped.
+        """
+        result = QueryResult(question=question, trace=Trace(question))
+        return await self._complete(result, self._answer(question, result, stream), timeout)
+
+    async def answer_intent(self, intent: dict, timeout: float | None = None) -> QueryResult:
+        """
+        Runs an already structured intent, skipping the parser, with the same
+        timeout and error handling as answer().
+        """
+        result = QueryResult(question="", intent=intent, trace=Trace(f"action {intent.get('action')}"))
+
+        async def run():
+            result.output = await self.run_action(intent)
+
+        return await self._complete(result, run(), timeout)
+
+    async def _complete(self, result: QueryResult, work, timeout: float | None) -> QueryResult:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = asyncio.get_running_loop().time() + timeout
+        with tracing(result.trace):
+            try:
+                await asyncio.wait_for(work, timeout)
+                if hasattr(result.output, "__aiter__"):
+                    # Counted once the caller has read the stream to its end, or it fails
+                    result.output = self._finish_stream(result, result.output, deadline, timeout)
+                else:
+                    count("queries", outcome="answered")
+            except asyncio.TimeoutError:
+                result.error = f"❌ Timed out after {timeout:g}s."
+                count("queries", outcome="timeout")
+            except Exception as e:
+                result.error = f"❌ Error answering question: {e}"
+                count("queries", outcome="error")
+        return result
+
+    async def _finish_stream(self, result: QueryResult, stream, deadline: float, timeout: float):
+        """
+        Passes a streamed answer through under the query's remaining time. A stream
+        that runs out of time sets QueryResult.error and raises TimeoutError.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    piece = await asyncio.wait_for(anext(stream), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                yield piece
+        except asyncio.TimeoutError:
+            result.error = f"❌ Timed out after {timeout:g}s."
+            count("queries", outcome="timeout")
+            raise
+        except Exception as e:
+            result.error = f"❌ Error answering question: {e}"
+            count("queries", outcome="error")
+            raise
+        finally:
+            await stream.aclose()
+        count("queries", outcome="answered")
+
+    async def answer_many(self, questions: list[str], timeout: float | None = None) -> list[QueryResult]:
+        return await asyncio.gather(*(self.answer(question, timeout) for question in questions))
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
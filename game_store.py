@@ -0,0 +1,78 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from single_flight import SingleFlight
+from stats_cache import LIVE_SEASON_TTL, game_dates, get_league_game_log, is_completed_season
+
+
+def _positions(df: pd.DataFrame, column: str) -> dict:
+    # value -> row positions holding it, in date order; missing values are left out
+    return df.groupby(column, sort=False).indices
+
+
+class LeagueGames:
+    """
+    One row per player per game for a whole season, sorted by date, with the rows
+    of every player, team and opponent precomputed.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.copy()
+        if not df.empty:
+            df["GAME_DATE"] = game_dates(df["GAME_DATE"])
+            # "BOS vs. NYK" is a home game against New York, "BOS @ NYK" an away one
+            matchup = df["MATCHUP"].str.extract(r"^\s*\S+\s+(vs\.|@)\s+(\S+)\s*$")
+            df["HOME"] = matchup[0] == "vs."
+            df["OPPONENT"] = matchup[1]
+            team_ids = dict(zip(df["TEAM_ABBREVIATION"], df["TEAM_ID"]))
+            df["OPPONENT_ID"] = df["OPPONENT"].map(team_ids)
+            df = df.sort_values("GAME_DATE", kind="stable").reset_index(drop=True)
+        self.df = df
+        self.loaded_at = time.time()
+        self.dates = df["GAME_DATE"].to_numpy() if not df.empty else np.array([], dtype="datetime64[ns]")
+        self.rows_of_player = _positions(df, "PLAYER_ID") if not df.empty else {}
+        self.rows_of_team = _positions(df, "TEAM_ID") if not df.empty else {}
+        self.rows_of_opponent = _positions(df, "OPPONENT_ID") if not df.empty else {}
+
+    def between(self, start, end) -> pd.DataFrame:
+        # Dates are sorted, so a range is two binary searches
+        first = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), side="left")
+        last = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1)), side="left")
+        return self.df.iloc[first:last]
+
+    def player_games(self, player_id: int) -> pd.DataFrame:
+        return self.df.iloc[self.rows_of_player.get(player_id, [])]
+
+    def team_games(self, team_id: int) -> pd.DataFrame:
+        return self.df.iloc[self.rows_of_team.get(team_id, [])]
+
+    def games_against(self, team_id: int) -> pd.DataFrame:
+        return self.df.iloc[self.rows_of_opponent.get(team_id, [])]
+
+
+_games: dict[tuple, LeagueGames] = {}
+_lock = threading.Lock()
+_loads = SingleFlight()
+
+
+def get_league_games(season: str, season_type: str = "Regular Season") -> LeagueGames:
+    """
+    Loads a season's league-wide game log once and keeps it in memory, indexed by
+    player, team, opponent and date.
+    """
+    key = (season, season_type)
+    with _lock:
+        games = _games.get(key)
+    if games is not None and (is_completed_season(season) or time.time() - games.loaded_at < LIVE_SEASON_TTL):
+        return games
+
+    def load():
+        loaded = LeagueGames(get_league_game_log(season, season_type))
+        with _lock:
+            _games[key] = loaded
+        return loaded
+
+    return _loads.do(key, load)
@@ -0,0 +1,360 @@
+"""
+Deterministic parser for the common question shapes in the GPT prompt's examples.
+
+parse_query_locally() returns an intent dict in the same shape parse_query_with_gpt
+produces, or None when it is not confident and the question should go to the LLM.
+"""
+import re
+
+from metrics import count
+from player_index import fold, get_player_index
+from team_index import get_team_index
+
+# Below this the local parse is discarded and the LLM is asked instead
+CONFIDENCE_THRESHOLD = 0.75
+
+# Phrase -> stat name as the GPT prompt would emit it (understood by stat_name_to_column)
+STAT_PHRASES = {
+    "points": "points",
+    "point": "points",
+    "scoring": "points",
+    "scorer": "points",
+    "assists": "assists",
+    "rebounds": "rebounds",
+    "rebounding": "rebounds",
+    "steals": "steals",
+    "blocks": "blocks",
+    "3-point percentage": "3pt%",
+    "3 point percentage": "3pt%",
+    "three point percentage": "3pt%",
+    "three-point percentage": "3pt%",
+    "3pt percentage": "3pt%",
+    "3pt%": "3pt%",
+    "3p%": "3pt%",
+    "fg3%": "3pt%",
+    "field goal percentage": "fg%",
+    "field goal %": "fg%",
+    "fg%": "fg%",
+    "free throw percentage": "ft%",
+    "free throw %": "ft%",
+    "ft%": "ft%",
+    "free throw attempts": "free throw attempts",
+    "fta": "free throw attempts",
+    "free throws made": "free throws made",
+    "ftm": "free throws made",
+    "free throws": "free throws",
+}
+
+# Per-game shorthands expand to "<stat> per game"
+PER_GAME_SHORTHANDS = {
+    "ppg": "points",
+    "apg": "assists",
+    "rpg": "rebounds",
+    "spg": "steals",
+    "bpg": "blocks",
+}
+
+# Only the counting stats have a "per game" variant in stat_name_to_column
+PER_GAME_STATS = {"points", "assists", "rebounds", "steals", "blocks"}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+# Capitalized words that are not names, so leaving them unmatched costs no confidence
+KNOWN_CAPITALIZED = {"nba", "i", "mvp", "vs", "per", "east", "eastern", "west", "western", "conference"}
+
+def _tokens(text: str) -> list[str]:
+    # Words with possessives removed ("Booker's" -> "booker", "Lakers'" -> "lakers")
+    words = re.findall(r"[\w%.\-']+", fold(text))
+    return [re.sub(r"'s?$", "", word).strip(".-") for word in words]
+
+
+def _find_players(tokens: list[str]) -> tuple[list[str], set[int]]:
+    index = get_player_index()
+    found = []
+    used = set()
+    for size in (3, 2):
+        for start in range(len(tokens) - size + 1):
+            span = set(range(start, start + size))
+            if span & used:
+                continue
+            player = index.lookup(" ".join(tokens[start:start + size]))
+            if player and player["full_name"] not in [n for _, n in found]:
+                found.append((start, player["full_name"]))
+                used |= span
+    return [name for _, name in sorted(found)], used
+
+
+def _find_teams(tokens: list[str], raw_words: list[str], season: str) -> tuple[list[str], set[int]]:
+    index = get_team_index()
+    found = []
+    used = set()
+    for size in (4, 3, 2, 1):
+        for start in range(len(tokens) - size + 1):
+            span = set(range(start, start + size))
+            if span & used:
+                continue
+            key = " ".join(tokens[start:start + size])
+            # Abbreviations only count in capitals, otherwise "was" would be Washington
+            if size == 1 and key in index.abbreviations and not raw_words[start].isupper():
+                continue
+            team = index.lookup(key, season)
+            if team and team[1] not in [n for _, n in found]:
+                found.append((start, team[1]))
+                used |= span
+    return [name for _, name in sorted(found)], used
+
+
+def _find_stats(text: str) -> list[str]:
+    stats = []
+    per_game = bool(re.search(r"\bper game\b|\bper-game\b", text))
+    matches = []
+    for phrase in sorted(STAT_PHRASES, key=len, reverse=True):
+        for match in re.finditer(rf"(?<![\w%]){re.escape(phrase)}(?![\w%])", text):
+            if any(match.start() < end and start < match.end() for start, end, _ in matches):
+                continue
+            matches.append((match.start(), match.end(), STAT_PHRASES[phrase]))
+    for shorthand, stat in PER_GAME_SHORTHANDS.items():
+        for match in re.finditer(rf"\b{shorthand}\b", text):
+            matches.append((match.start(), match.end(), f"{stat} per game"))
+    for _, _, stat in sorted(matches):
+        if per_game and stat in PER_GAME_STATS:
+            stat = f"{stat} per game"
+        if stat not in stats:
+            stats.append(stat)
+    return stats
+
+
+def _parse_season(text: str) -> str:
+    match = re.search(r"\b(\d{4})-(\d{2}|\d{4})\b", text)
+    if match:
+        return f"{match.group(1)}-{match.group(2)[-2:]}"
+    if re.search(r"\b(last|previous) (season|year)\b", text):
+        return "last season"
+    # No season mentioned means the current one, same as the prompt's examples
+    return "this season"
+
+
+def _parse_number(word: str) -> int | None:
+    if word.isdigit():
+        return int(word)
+    return NUMBER_WORDS.get(word)
+
+
+def _confidence(raw_words: list[str], used: set[int]) -> float:
+    # A capitalized word we could not place is probably a name we do not know
+    for i, word in enumerate(raw_words):
+        if i == 0 or i in used:
+            continue
+        if word[:1].isupper() and fold(word) not in KNOWN_CAPITALIZED:
+            return 0.5
+    return 1.0
+
+
+def _match(user_input: str) -> tuple[dict | None, float]:
+    text = " ".join(_tokens(user_input))
+    raw_words = [re.sub(r"'s?$", "", word) for word in re.findall(r"[\w%.\-']+", user_input)]
+    season_type = "Playoffs" if re.search(r"\bplayoffs?\b|\bpostseason\b", text) else None
+
+    # explain_stat keeps the user's casing ("PER", "True Shooting Percentage")
+    explain = re.match(r"^\s*(?:what does|what do)\s+(.+?)\s+(?:mean|stand for)\s*\??\s*$", user_input, re.I) \
+        or re.match(r"^\s*(?:explain|define|tell me about|what is meant by)\s+(.+?)\s*\??\s*$", user_input, re.I)
+    if explain:
+        return {"action": "explain_stat", "stat_name": explain.group(1).strip()}, 1.0
+
+    player_names, player_used = _find_players(_tokens(user_input))
+    team_names, team_used = _find_teams(_tokens(user_input), raw_words, _parse_season(text))
+    used = player_used | team_used
+    stats = _find_stats(text)
+    confidence = _confidence(raw_words, used)
+
+    against = re.search(r"\bagainst\b|\bvs\.?\b|\bversus\b|\bhead to head\b|\bhead-to-head\b", text)
+    if team_names and player_names:
+        if against and len(team_names) == 1 and len(player_names) == 1:
+            intent = {
+                "action": "get_head_to_head",
+                "player_name": player_names[0],
+                "team_name": team_names[0],
+                "season": _parse_season(text),
+            }
+            if season_type:
+                intent["season_type"] = season_type
+            return intent, confidence
+        return None, 0.0  # Other mixed questions are left to the LLM
+
+    if re.search(r"\bleague average\b|\baverage\b", text) and stats and not player_names and not team_names:
+        intent = {"action": "get_league_average", "stat_name": stats[0], "season": _parse_season(text)}
+        if season_type:
+            intent["season_type"] = season_type
+        return intent, confidence if len(stats) == 1 else 0.5
+
+    if team_names:
+        if len(team_names) > 1:
+            if re.search(r"\brecords?\b", text):
+                return {"action": "get_team_records", "team_names": team_names, "season": _parse_season(text)}, confidence
+            return None, 0.0
+        if re.search(r"\bgames? (?:back|behind)\b|\bgb\b", text):
+            return {"action": "get_games_back", "team_name": team_names[0], "season": _parse_season(text)}, confidence
+        minimum = re.search(r"\b(\d+)\s*\+|\b(\d+) or more\b|\bat least (\d+)\b", user_input.lower())
+        if against and minimum:
+            intent = {
+                "action": "get_games_against",
+                "team_name": team_names[0],
+                "stat": stats[0] if len(stats) == 1 else "points",
+                "minimum": int(next(group for group in minimum.groups() if group)),
+                "season": _parse_season(text),
+            }
+            if season_type:
+                intent["season_type"] = season_type
+            # "Who has the most 40+ point games against..." counts games rather than listing them
+            counts_games = re.search(r"\bmost\b|\bhow many\b", text)
+            return intent, confidence if len(stats) <= 1 and not counts_games else 0.5
+        if against or re.search(r"\bgames\b|\btimes\b", text):
+            # Questions about games against a team without a minimum, or that count games
+            # or times, are not team records or leaders; leave them to the LLM
+            return None, 0.0
+        if re.search(r"\brecord\b|\bstandings?\b", text):
+            return {"action": "get_team_record", "team_name": team_names[0], "season": _parse_season(text)}, confidence
+        if stats and re.search(r"\blead(s|er|ers|ing)?\b|\bled\b|\bbest\b|\bmost\b|\btop\b", text):
+            return {
+                "action": "get_team_leader",
+                "team_name": team_names[0],
+                "stat_name": stats[0],
+                "season": _parse_season(text),
+            }, confidence if len(stats) == 1 else 0.5
+        return None, 0.0
+
+    if player_names:
+        if len(player_names) == 1 and re.search(r"\branks?\b|\branked\b|\branking\b|\bpercentile\b", text):
+            intent = {
+                "action": "get_player_rank",
+                "player_name": player_names[0],
+                "stats": stats,
+                "season": _parse_season(text),
+            }
+            if re.search(r"\bper game\b|\bper-game\b", text) or any(stat.endswith(" per game") for stat in stats):
+                intent["per_mode"] = "PerGame"
+            if season_type:
+                intent["season_type"] = season_type
+            return intent, confidence
+
+        if len(player_names) == 1 and re.search(r"\bleague (?:average|avg)\b|\baverage (?:player|nba player)\b", text):
+            intent = {
+                "action": "compare_to_league_average",
+                "player_name": player_names[0],
+                "stats": stats,
+                "season": _parse_season(text),
+            }
+            if re.search(r"\btotals?\b", text):
+                intent["per_mode"] = "Totals"
+            if season_type:
+                intent["season_type"] = season_type
+            return intent, confidence
+
+        if re.search(r"\bcompare\b|\bvs\.?\b|\bversus\b", text):
+            if len(player_names) < 2 or not stats:
+                return None, 0.0
+            intent = {
+                "action": "compare_players",
+                "players": player_names,
+                "stats": stats,
+                "season": _parse_season(text),
+            }
+            seasons = re.search(r"\b(?:last|past) (\w+) (years|seasons)\b", text)
+            if seasons and _parse_number(seasons.group(1)):
+                del intent["season"]
+                intent["seasons"] = f"last {_parse_number(seasons.group(1))} {seasons.group(2)}"
+            per_game = re.search(r"\bper game\b|\bper-game\b", text)
+            if per_game and re.search(r"\btotals?\b", text):
+                intent["per_mode"] = "Both"
+            elif per_game:
+                intent["per_game"] = True
+            return intent, confidence
+
+        if len(player_names) != 1:
+            return None, 0.0
+
+        games = re.search(r"\blast (\w+) (?:\w+ )?games?\b", text)
+        if games or re.search(r"\bgame ?log\b", text):
+            limit = _parse_number(games.group(1)) if games else 5
+            if limit is None:
+                return None, 0.0
+            intent = {"action": "get_player_game_log", "player_name": player_names[0], "limit": limit}
+            # Without a season, the last N games are counted across season boundaries
+            if _parse_season(text) != "this season" or re.search(r"\bthis (season|year)\b", text):
+                intent["season"] = _parse_season(text)
+            if season_type:
+                intent["season_type"] = season_type
+            return intent, confidence
+
+        seasons = re.search(r"\blast (\w+) (years|seasons)\b", text)
+        if seasons and len(stats) == 1 and _parse_number(seasons.group(1)):
+            stat = stats[0].replace(" per game", "_per_game").replace(" ", "_")
+            return {
+                "action": "get_player_stats",
+                "player": player_names[0],
+                "stat": stat,
+                "range": f"last {_parse_number(seasons.group(1))} {seasons.group(2)}",
+            }, confidence
+        return None, 0.0
+
+    conference = re.search(r"\b(east|eastern|west|western)(?: conference)? standings\b|\bstandings (?:in|of) the (east|eastern|west|western)\b", text)
+    if conference or re.search(r"^(?:nba |league |the )?standings\b|\bconference standings\b", text):
+        name = next((group for group in conference.groups() if group), "") if conference else ""
+        return {
+            "action": "get_conference_standings",
+            "conference": {"eastern": "East", "western": "West"}.get(name, name.title()),
+            "season": _parse_season(text),
+        }, confidence
+
+    date_range = re.search(r"\b(?:last|past|this) (?:\w+ )?(?:days?|weeks?|months?)\b|\byesterday\b|\btoday\b|\d{4}-\d{2}-\d{2}(?: to \d{4}-\d{2}-\d{2})?", text)
+    if re.search(r"\b(?:best|biggest|top) (?:\w+ ){0,2}games?\b|\bgames? of the\b", text) and len(stats) <= 1:
+        intent = {"action": "get_best_games", "stat": stats[0] if stats else "points", "limit": 10}
+        top = re.search(r"\btop (\w+)\b", text)
+        if top and _parse_number(top.group(1)):
+            intent["limit"] = _parse_number(top.group(1))
+        if date_range:
+            intent["date_range"] = date_range.group(0)
+        else:
+            intent["season"] = _parse_season(text)
+        if season_type:
+            intent["season_type"] = season_type
+        return intent, confidence
+
+    if len(stats) == 1:
+        top = re.search(r"\btop (\w+)\b", text)
+        if top and _parse_number(top.group(1)):
+            intent = {
+                "action": "get_top_players",
+                "stat": stats[0],
+                "season": _parse_season(text),
+                "limit": _parse_number(top.group(1)),
+            }
+        elif re.search(r"\bmost\b|\bhighest\b|\btop\b|\bleaders\b", text):
+            intent = {"action": "get_top_players", "stat": stats[0], "season": _parse_season(text), "limit": 5}
+        elif re.search(r"\bled\b|\bleads?\b|\bleader\b|\bleading\b", text):
+            intent = {"action": "get_stat_leader", "stat": stats[0], "season": _parse_season(text)}
+        else:
+            return None, 0.0
+        if season_type:
+            intent["season_type"] = season_type
+        return intent, confidence
+
+    return None, 0.0
+
+
+def parse_query_locally(user_input: str) -> dict | None:
+    """
+    Returns the parsed intent, or None when the question should go to the LLM.
+    """
+    intent, confidence = _match(user_input)
+    if intent is None or confidence < CONFIDENCE_THRESHOLD:
+        return None
+    return intent
+
+
+def record_parse(source: str):
+    # source is "local" or "llm"; the live hit rate is chat_nba_parses_total in render_metrics()
+    count("parses", source=source)
@@ -0,0 +1,121 @@
+"""
+Persistent, size-bounded LRU store for deterministic GPT answers.
+
+Entries live in a SQLite file under the stats cache directory. Each entry records
+the version it was written under (a hash of the prompt and model), so editing a
+prompt makes its old entries misses.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from metrics import count
+from stats_cache import CACHE_DIR, current_season
+
+DB_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+
+# Relative season phrases -> one spelling, so "last year" and "previous season" share a key
+RELATIVE_SEASON_PHRASES = [
+    (r"\b(last|previous|past) (season|year)\b", "last season"),
+    (r"\b(this|current) (season|year)\b", "this season"),
+]
+
+
+def prompt_version(*parts: str) -> str:
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def canonicalize_query(text: str) -> str:
+    """
+    Folds case, accents, punctuation, whitespace and relative-season wording.
+    The current season is appended, since "this season" means something
+    different once the calendar rolls over.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"'s\b|'", "", text)  # Possessives: "booker's" -> "booker"
+    text = re.sub(r"[^\w%\-\s]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    for pattern, replacement in RELATIVE_SEASON_PHRASES:
+        text = re.sub(pattern, replacement, text)
+    return f"{text} @{current_season()}"
+
+
+class PersistentLRUCache:
+    def __init__(self, namespace: str, version: str, max_entries: int, path: str = DB_PATH):
+        self.namespace = namespace
+        self.version = version
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use so importing this module never touches the disk
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, version TEXT NOT NULL,"
+                " value TEXT NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, last_used)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str):
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ? AND version = ?",
+                (self.namespace, key, self.version),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                count("llm_cache", namespace=self.namespace, result="miss")
+                return None
+            conn.execute(
+                "UPDATE entries SET last_used = ? WHERE namespace = ? AND key = ?",
+                (time.time(), self.namespace, key),
+            )
+            conn.commit()
+            self.hits += 1
+            count("llm_cache", namespace=self.namespace, result="hit")
+            return json.loads(row[0])
+
+    def set(self, key: str, value):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, version, value, last_used) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, self.version, json.dumps(value), time.time()),
+            )
+            # Entries from older prompt versions go first, then the least recently used
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND version != ?",
+                (self.namespace, self.version),
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key IN ("
+                " SELECT key FROM entries WHERE namespace = ? ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+            conn.commit()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
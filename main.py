@@ -1,141 +1,142 @@
+import argparse
+import asyncio
+import json
+import os
+from typing import TYPE_CHECKING
+
 from utils import print_banner
-from openai_helper import parse_query_with_gpt, get_stat_explanation_with_gpt, answer_historical_nba_fact_with_gpt
-from nba_stats import get_top_players_by_stat, compare_players, get_player_stats_over_seasons, get_team_leader, get_team_record, get_league_average_for_stat, get_player_game_log
-import pandas as pd
-from tabulate import tabulate
+from metrics import render_metrics, stage, tracing
 
-def main():
-    print_banner()
-    print("Welcome to Chat NBA! Ask me anything about NBA stats.")
-    print("(Type 'exit' to quit)\n")
+if TYPE_CHECKING:
+    from engine import QueryResult
+
+# Only light modules are imported above, so the banner and prompt appear at once.
+# The engine (pandas, nba_api, indexes) loads in the background while the first question is typed.
+
+
+def warm_up():
+    import engine  # noqa: F401  pulls in pandas and nba_stats
+    import tabulate  # noqa: F401
+    from player_index import get_player_index
+    from team_index import get_team_index
 
-    while True:
-        user_input = input("> ")
+    get_player_index()
+    get_team_index()
 
-        if user_input.lower() in ["exit", "quit"]:
-            print("Goodbye!")
-            break
 
-        print("\nThinking...\n")
-        result = parse_query_with_gpt(user_input)
-        print("Parsed intent:")
-        print(result)
+def render(result: "QueryResult"):
+    import pandas as pd
+    from tabulate import tabulate
+
+    print("Parsed intent:")
+    print(result.intent)
+    print()
+
+    if result.error:
+        print(result.error)
         print()
+        return
 
-        if result.get("action") == "get_top_players":
-            table = get_top_players_by_stat(
-                stat_name=result.get("stat", ""),
-                season=result.get("season", ""),
-                limit=result.get("limit", 5),
-                season_type=result.get("season_type", "Regular Season")
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
-            print()
+    output = result.output
+    if output is None:
+        return
 
-        elif result.get("action") == "get_stat_leader":
-            # Alias for get_top_players with limit=1
-            table = get_top_players_by_stat(
-                stat_name=result.get("stat", ""),
-                season=result.get("season", ""),
-                limit=1,
-                season_type=result.get("season_type", "Regular Season")
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
-            print()
+    if result.intent.get("action") == "explain_stat" and result.intent.get("stat_name"):
+        print(f"Explanation for {result.intent['stat_name'].upper()}:")
 
-        elif result.get("action") == "get_player_stats":
-            table = get_player_stats_over_seasons(
-                player_name=result.get("player", ""),
-                stat_name=result.get("stat", ""),
-                season_range=result.get("range", "")
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
-            print()
+    if isinstance(output, pd.DataFrame):
+        print(tabulate(output, headers='keys', tablefmt='grid', showindex=False))
+    else:
+        print(output)
+    print()
 
-        elif result.get("action") == "get_team_leader":
-            table = get_team_leader(
-                team_name=result.get("team_name", ""),
-                stat_name=result.get("stat_name", ""),
-                season=result.get("season", "")
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
-            print()
 
-        elif result.get("action") == "get_team_record":
-            table = get_team_record(
-                team_name=result.get("team_name", ""),
-                season=result.get("season", "")
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
-            print()
+async def render_stream(result: "QueryResult"):
+    # GPT answers arrive as pieces of text; print each as soon as it comes.
+    # The engine gives the stream the rest of the question's timeout.
+    print("Parsed intent:")
+    print(result.intent)
+    print()
 
-        elif result.get("action") == "explain_stat":
-            stat_to_explain = result.get("stat_name", "")
-            if stat_to_explain:
-                explanation = get_stat_explanation_with_gpt(stat_to_explain)
-                print(f"Explanation for {stat_to_explain.upper()}:")
-                print(explanation)
-            else:
-                print("❌ Could not determine which stat to explain.")
-            print()
+    if result.intent.get("action") == "explain_stat" and result.intent.get("stat_name"):
+        print(f"Explanation for {result.intent['stat_name'].upper()}:")
 
-        elif result.get("action") == "get_league_average":
-            table = get_league_average_for_stat(
-                stat_name=result.get("stat_name", ""),
-                season=result.get("season", ""),
-                season_type=result.get("season_type", "Regular Season")
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
+    with stage("stream"):
+        try:
+            async for piece in result.output:
+                print(piece, end="", flush=True)
+        except Exception:
             print()
+            print(result.error, end="")
+    print()
+    print()
 
-        elif result.get("action") == "get_player_game_log":
-            table = get_player_game_log(
-                player_name=result.get("player_name", ""),
-                season=result.get("season", ""),
-                limit=result.get("limit", 5),
-                season_type=result.get("season_type", "Regular Season")
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
-            print()
 
-        elif result.get("action") == "get_historical_nba_fact":
-            answer = answer_historical_nba_fact_with_gpt(result)
-            print(answer)
-            print()
+def write_trace(result: "QueryResult", trace_dir: str):
+    os.makedirs(trace_dir, exist_ok=True)
+    trace = result.trace.to_dict()
+    trace.update(intent=result.intent, error=result.error)
+    name = f"{int(trace['started_at'] * 1000)}.json"
+    with open(os.path.join(trace_dir, name), "w", encoding="utf-8") as f:
+        json.dump(trace, f, indent=2, default=str)
 
-        elif result.get("action") == "compare_players":
-            table = compare_players(
-                player_names=result.get("players", []),
-                stat_names=result.get("stats", []),
-                season=result.get("season", ""),
-                per_game=result.get("per_game", False)
-            )
-            if isinstance(table, pd.DataFrame):
-                print(tabulate(table, headers='keys', tablefmt='grid', showindex=False))
-            else:
-                print(table)
-            print()
+
+async def repl(profile: bool = False, trace_dir: str | None = None):
+    loop = asyncio.get_running_loop()
+    warming = loop.run_in_executor(None, warm_up)
+    engine = None
+    try:
+        while True:
+            # input() blocks, so keep it off the event loop
+            user_input = await loop.run_in_executor(None, input, "> ")
+
+            if user_input.lower() in ["exit", "quit"]:
+                print("Goodbye!")
+                break
+            if user_input.lower() == "metrics":
+                print(render_metrics())
+                continue
+
+            print("\nThinking...\n")
+            if engine is None:
+                await warming
+                from engine import QueryEngine
+                engine = QueryEngine()
+            result = await engine.answer(user_input, stream=True)
+            with tracing(result.trace):
+                if hasattr(result.output, "__aiter__"):
+                    await render_stream(result)
+                else:
+                    with stage("render"):
+                        render(result)
+
+            if profile:
+                print(result.trace.breakdown())
+                print()
+            if trace_dir:
+                write_trace(result, trace_dir)
+    finally:
+        if engine is not None:
+            engine.close()
+
+
+def main():
+    # Before anything reads CHAT_NBA_* settings
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Chat NBA")
+    parser.add_argument("--profile", action="store_true", default=os.getenv("CHAT_NBA_PROFILE", "") == "1",
+                        help="print a timing breakdown after every answer")
+    parser.add_argument("--trace-dir", default=os.getenv("CHAT_NBA_TRACE_DIR"),
+                        help="write a JSON trace of every question to this directory")
+    args = parser.parse_args()
+
+    print_banner()
+    print("Welcome to Chat NBA! Ask me anything about NBA stats.")
+    print("(Type 'exit' to quit)\n")
+
+    asyncio.run(repl(args.profile, args.trace_dir))
 
 if __name__ == "__main__":
     main()
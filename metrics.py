@@ -0,0 +1,162 @@
+"""
+Per-query traces and process-wide counters.
+
+Code being measured wraps itself in stage("name") (or @timed) and calls count(...)
+for events like cache hits, bytes fetched and LLM tokens. Both land on the trace of
+the query being answered, if there is one, and on aggregate counters that
+render_metrics() returns in Prometheus text format.
+
+The current trace travels in a context variable, so it follows asyncio tasks.
+Work handed to a thread pool must be run with contextvars.copy_context().run.
+"""
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class Trace:
+    def __init__(self, question: str):
+        self.question = question
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.stages: list[dict] = []
+        self.counters: dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, depth: int, start: float, elapsed_ms: float):
+        with self._lock:
+            self.stages.append({
+                "stage": name,
+                "depth": depth,
+                "start_ms": round((start - self._start) * 1000, 3),
+                "ms": round(elapsed_ms, 3),
+            })
+
+    def add(self, key: str, value: float):
+        with self._lock:
+            self.counters[key] += value
+
+    def total_ms(self) -> float:
+        return max((stage["start_ms"] + stage["ms"] for stage in self.stages if stage["depth"] == 0), default=0.0)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "question": self.question,
+                "started_at": self.started_at,
+                "total_ms": round(self.total_ms(), 3),
+                # Stages finish inner-first; list them in the order they started
+                "stages": sorted(self.stages, key=lambda stage: (stage["start_ms"], stage["depth"])),
+                "counters": dict(self.counters),
+            }
+
+    def breakdown(self) -> str:
+        trace = self.to_dict()
+        lines = [f"{'stage':<64}{'ms':>10}"]
+        for stage in trace["stages"]:
+            lines.append(f"{'  ' * stage['depth'] + stage['stage']:<64}{stage['ms']:>10.1f}")
+        for key, value in sorted(trace["counters"].items()):
+            lines.append(f"{key:<64}{value:>10g}")
+        return "\n".join(lines)
+
+
+_trace: ContextVar[Trace | None] = ContextVar("chat_nba_trace", default=None)
+_depth: ContextVar[int] = ContextVar("chat_nba_stage_depth", default=0)
+
+# (stage) -> [count, total seconds]; (counter name, labels) -> value
+_stage_totals: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+_counters: dict[tuple, float] = defaultdict(float)
+_lock = threading.Lock()
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+@contextmanager
+def tracing(trace: Trace):
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    token = _depth.set(_depth.get() + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _depth.reset(token)
+        record_stage(name, start, time.perf_counter() - start)
+
+
+def record_stage(name: str, start: float, elapsed: float):
+    """
+    Records a span measured by hand: start is a perf_counter() reading, elapsed in seconds.
+    """
+    depth = _depth.get()
+    with _lock:
+        totals = _stage_totals[name]
+        totals[0] += 1
+        totals[1] += elapsed
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_stage(name, depth, start, elapsed * 1000)
+
+
+def timed(name: str | None = None):
+    def decorate(function):
+        stage_name = name or f"{function.__module__}.{function.__name__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name: str, value: float = 1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] += value
+    trace = _trace.get()
+    if trace is not None:
+        label_text = ",".join(f"{k}={v}" for k, v in key[1])
+        trace.add(f"{name}[{label_text}]" if label_text else name, value)
+
+
+def count_tokens(response, model: str):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    count("llm_prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0, model=model)
+    count("llm_completion_tokens", getattr(usage, "completion_tokens", 0) or 0, model=model)
+
+
+def render_metrics() -> str:
+    """
+    Aggregate counters since the process started, in Prometheus text format.
+    """
+    lines = [
+        "# TYPE chat_nba_stage_seconds summary",
+    ]
+    with _lock:
+        for name, (calls, seconds) in sorted(_stage_totals.items()):
+            lines.append(f'chat_nba_stage_seconds_count{{stage="{name}"}} {calls}')
+            lines.append(f'chat_nba_stage_seconds_sum{{stage="{name}"}} {seconds:.6f}')
+        names = sorted({name for name, _ in _counters})
+        for name in names:
+            lines.append(f"# TYPE chat_nba_{name}_total counter")
+            for (counter, labels), value in sorted(_counters.items()):
+                if counter != name:
+                    continue
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"chat_nba_{name}_total{{{label_text}}} {value:g}" if label_text else f"chat_nba_{name}_total {value:g}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,147 @@
+"""
+Request layer for every stats.nba.com call.
+
+nba_api endpoints are built with get_request=False and their request is sent here
+instead, over one pooled keep-alive session. Requests wait for a token from a
+shared token bucket and a slot in a bounded semaphore, and throttled (429/5xx) or
+timed-out requests are retried with jittered exponential backoff.
+
+    endpoint = fetch_endpoint(leaguedashplayerstats.LeagueDashPlayerStats, season="2023-24")
+    df = endpoint.get_data_frames()[0]
+"""
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from nba_api.stats.library.http import NBAStatsHTTP
+
+from metrics import count, stage
+
+# Sustained requests per second and the burst allowed on top of it.
+# stats.nba.com starts throttling somewhere above a couple of requests a second.
+RATE_LIMIT = float(os.getenv("CHAT_NBA_RATE_LIMIT", "2"))
+RATE_BURST = int(os.getenv("CHAT_NBA_RATE_BURST", "4"))
+
+# Requests in flight at once, across all threads
+MAX_CONCURRENT_REQUESTS = int(os.getenv("CHAT_NBA_MAX_CONCURRENT_REQUESTS", "4"))
+
+# Seconds to wait for a response, and retries after the first attempt
+REQUEST_TIMEOUT = float(os.getenv("CHAT_NBA_REQUEST_TIMEOUT", "20"))
+MAX_RETRIES = int(os.getenv("CHAT_NBA_MAX_RETRIES", "4"))
+
+# Backoff before retry n is uniform in [0, min(BACKOFF_CAP, BACKOFF_BASE * 2**n)]
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Reserve a token now, then sleep outside the lock until it has refilled
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+_bucket = TokenBucket(RATE_LIMIT, RATE_BURST)
+_semaphore = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+# Counters for benchmarks and debugging
+request_stats = {"requests": 0, "retries": 0, "failures": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str):
+    with _stats_lock:
+        request_stats[key] += 1
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_REQUESTS)
+                session.mount("https://", adapter)
+                session.headers.update(NBAStatsHTTP.headers)
+                _session = session
+    return _session
+
+
+def _backoff(attempt: int, retry_after: str | None = None) -> float:
+    if retry_after and retry_after.isdigit():
+        return min(BACKOFF_CAP, float(retry_after))
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def send_request(endpoint: str, parameters: dict):
+    """
+    GETs one stats.nba.com endpoint and returns nba_api's response object.
+    Raises the last error once retries are used up.
+    """
+    url = NBAStatsHTTP.base_url.format(endpoint=endpoint)
+    # nba_api sorts parameters too; some endpoints care
+    params = sorted(parameters.items(), key=lambda kv: kv[0])
+
+    for attempt in range(MAX_RETRIES + 1):
+        retry_after = None
+        with _semaphore:
+            _bucket.acquire()
+            _count("requests")
+            try:
+                with stage(f"http.{endpoint}"):
+                    response = get_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                count("http_errors", endpoint=endpoint, kind=type(e).__name__)
+                error = e
+            else:
+                count("http_bytes", len(response.content), endpoint=endpoint)
+                count("http_responses", endpoint=endpoint, status=response.status_code)
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code >= 400:
+                        # Not worth retrying, but still a failed request
+                        _count("failures")
+                    response.raise_for_status()
+                    contents = NBAStatsHTTP().clean_contents(response.text)
+                    return NBAStatsHTTP.nba_response(response=contents, status_code=response.status_code, url=response.url)
+                error = requests.HTTPError(f"{response.status_code} from {endpoint}", response=response)
+                retry_after = response.headers.get("Retry-After")
+
+        if attempt == MAX_RETRIES:
+            break
+        _count("retries")
+        # Sleep without holding a slot, so other requests keep flowing
+        time.sleep(_backoff(attempt, retry_after))
+
+    _count("failures")
+    raise error
+
+
+def fetch_endpoint(endpoint_class, **kwargs):
+    """
+    Builds an nba_api endpoint without letting it make its own request, then loads
+    it from a response fetched through send_request.
+    """
+    endpoint = endpoint_class(**kwargs, get_request=False)
+    endpoint.nba_response = send_request(endpoint.endpoint, endpoint.parameters)
+    endpoint.load_response()
+    return endpoint
@@ -1,31 +1,28 @@
-from nba_api.stats.endpoints import leaguedashplayerstats, playercareerstats, leaguestandingsv3, playergamelog
-from nba_api.stats.static import players, teams
+import numpy as np
 import pandas as pd
+from stats_cache import current_season, game_dates, get_player_career_stats, get_player_game_log_frame
+from season_store import LEAGUE_QUALIFIERS, get_season_frame
+from game_store import get_league_games
+from standings_store import get_standings
+from player_index import get_player_index
+from team_index import get_team_index
+from metrics import timed
 import re # For parsing range
-from datetime import datetime # For determining current year
+from datetime import date, datetime, timedelta # For determining current year
 
+@timed()
 def get_top_players_by_stat(stat_name: str, season: str, limit: int = 5, season_type: str = "Regular Season"):
     season = normalize_season(season)
 
-    stats = leaguedashplayerstats.LeagueDashPlayerStats(
-        season=season,
-        season_type_all_star=season_type
-    ).get_data_frames()[0]
+    season_frame = get_season_frame(season, per_mode="Totals", season_type=season_type)
     stat_column = stat_name_to_column(stat_name)
 
-    if stat_column not in stats.columns:
+    if stat_column not in season_frame.rank_order:
         return f"❌ Stat '{stat_name}' not found in data."
 
-    # Add filters to exclude players with too few attempts
-    if stat_column == "FG3_PCT":
-        stats = stats[stats["FG3A"] > 100]  # e.g. min 100 3PA
-    elif stat_column == "FT_PCT":
-        stats = stats[stats["FTA"] > 100]   # e.g. min 100 FTA
-    elif stat_column == "FG_PCT":
-        stats = stats[stats["FGA"] > 300]   # min 300 FG attempts
-
-    # Sort and limit
-    top_players = stats.sort_values(by=stat_column, ascending=False).head(limit)
+    # Rank order is precomputed per season, with the minimum attempt filters
+    # (100 3PA, 100 FTA, 300 FGA) already applied for the percentage stats
+    top_players = season_frame.top_players(stat_column, limit)
     return top_players[['PLAYER_NAME', stat_column]]
 
 
@@ -65,6 +62,13 @@ def stat_name_to_column(stat_name: str) -> str:
     return mapping.get(stat_name.lower(), stat_name)
 
 
+def per_mode_for_stat(stat_name: str) -> str:
+    # "points per game" / "points_per_game" ask for PerGame numbers, anything else Totals
+    if "per game" in stat_name.lower() or "_per_game" in stat_name.lower():
+        return "PerGame"
+    return "Totals"
+
+
 def normalize_season(season: str) -> str:
     mapping = {
         "2023-2024": "2023-24",
@@ -76,51 +80,20 @@ def normalize_season(season: str) -> str:
     }
     return mapping.get(season.lower(), season)
 
-def get_team_id(team_name_query: str) -> int | None:
-    # Attempt to find by full name (returns a list)
-    found_team_list = teams.find_teams_by_full_name(team_name_query)
-    if found_team_list:
-        return found_team_list[0]['id']
-
-    # Attempt to find by nickname (returns a list)
-    found_team_list = teams.find_teams_by_nickname(team_name_query)
-    if found_team_list:
-        return found_team_list[0]['id']
-
-    # Attempt to find by abbreviation (returns a dict or None)
-    team_by_abbr = teams.find_team_by_abbreviation(team_name_query) # Corrected method name
-    if team_by_abbr:
-        return team_by_abbr['id'] # Directly access id from dict
-
-    # Attempt to find by city (returns a list)
-    found_team_list = teams.find_teams_by_city(team_name_query)
-    if found_team_list:
-        return found_team_list[0]['id']
-    
-    # Simple custom mapping for common names GPT might produce
-    custom_mapping = { 
-        "warriors": "Golden State Warriors",
-        "lakers": "Los Angeles Lakers",
-        "celtics": "Boston Celtics",
-        "bucks": "Milwaukee Bucks",
-        "sixers": "Philadelphia 76ers", 
-        # Add more as needed
-    }
-    normalized_query = team_name_query.lower()
-    if normalized_query in custom_mapping:
-        # If custom mapping matches, search by the mapped full name
-        mapped_full_name = custom_mapping[normalized_query]
-        found_team_list_custom = teams.find_teams_by_full_name(mapped_full_name)
-        if found_team_list_custom:
-            return found_team_list_custom[0]['id']
-
-    return None
+def get_team_id(team_name_query: str, season: str | None = None) -> int | None:
+    # One hash lookup over full names, nicknames, abbreviations, cities, slang and
+    # historical franchise names. The season picks between relocated franchises.
+    team = get_team_index().lookup(team_name_query, season)
+    if not team:
+        return None
+    return team[0]
 
 def get_player_id(player_name: str):
-    player_find = players.find_players_by_full_name(player_name)
-    if not player_find:
+    # Exact or accent/case-folded match first, then an unambiguous fuzzy match
+    player = get_player_index().resolve(player_name)
+    if not player:
         return None
-    return player_find[0]['id']
+    return player['id']
 
 def parse_season_range(season_range_str: str) -> list[str]:
     match = re.match(r"last (\d+) (?:years|seasons)", season_range_str.lower())
@@ -155,6 +128,7 @@ def parse_season_range(season_range_str: str) -> list[str]:
     return sorted(seasons) # Return in chronological order
 
 
+@timed()
 def get_player_stats_over_seasons(player_name: str, stat_name: str, season_range: str):
     player_id = get_player_id(player_name)
     if not player_id:
@@ -164,7 +138,11 @@ def get_player_stats_over_seasons(player_name: str, stat_name: str, season_range
     # The playercareerstats endpoint uses "PerGame" or "Totals", let's assume "PerGame" based on example
     # "points per game" implies PerGame mode.
     
-    career_stats_df = playercareerstats.PlayerCareerStats(player_id=player_id, per_mode36="PerGame").get_data_frames()[0]
+    career_stats_df = get_player_career_stats(
+        player_id,
+        per_mode="PerGame",
+        columns=['SEASON_ID', stat_column_api, stat_name_to_column(stat_name.replace(" per game", ""))]
+    )
 
     if career_stats_df.empty:
         return f"❌ No career stats found for {player_name}."
@@ -197,9 +175,10 @@ def get_player_stats_over_seasons(player_name: str, stat_name: str, season_range
 
     return result_df
 
+@timed()
 def get_team_leader(team_name: str, stat_name: str, season: str):
     normalized_season = normalize_season(season)
-    team_id = get_team_id(team_name)
+    team_id = get_team_id(team_name, normalized_season)
 
     if not team_id:
         return f"❌ Team '{team_name}' not found."
@@ -211,18 +190,16 @@ def get_team_leader(team_name: str, stat_name: str, season: str):
     stat_column = stat_name_to_column(stat_name)
     
     # Determine if per_game is implied by the stat name
-    per_game_implied = "per game" in stat_name.lower() or "_per_game" in stat_name.lower()
-    per_mode_request = "PerGame" if per_game_implied else "Totals"
+    per_mode_request = per_mode_for_stat(stat_name)
 
+    # Team leaders come from the league-wide frame, loaded once per season and mode
     try:
-        team_player_stats_df = leaguedashplayerstats.LeagueDashPlayerStats(
-            season=normalized_season,
-            team_id_nullable=team_id,
-            per_mode_detailed=per_mode_request 
-        ).get_data_frames()[0]
+        season_frame = get_season_frame(normalized_season, per_mode=per_mode_request)
     except Exception as e:
         return f"❌ Error fetching team stats: {e}"
 
+    team_player_stats_df = season_frame.team_players(team_id)
+
     if team_player_stats_df.empty:
         return f"❌ No player stats found for {team_name} in season {normalized_season} (Mode: {per_mode_request})."
 
@@ -231,26 +208,14 @@ def get_team_leader(team_name: str, stat_name: str, season: str):
         # it's a genuine missing column.
         return f"❌ Stat '{stat_name}' (mapped to '{stat_column}') not found for {team_name} in season {normalized_season} (Mode: {per_mode_request}). Available columns: {team_player_stats_df.columns.tolist()}"
 
-    # Apply similar FG_PCT, FT_PCT, FG3_PCT filters as in get_top_players_by_stat if applicable
-    if stat_column == "FG3_PCT":
-        team_player_stats_df = team_player_stats_df[team_player_stats_df["FG3A"] > 10] # Lower threshold for single team leader
-    elif stat_column == "FT_PCT":
-        team_player_stats_df = team_player_stats_df[team_player_stats_df["FTA"] > 10]
-    elif stat_column == "FG_PCT":
-        team_player_stats_df = team_player_stats_df[team_player_stats_df["FGA"] > 20]
-        
-    if team_player_stats_df.empty:
-         return f"❌ No players found for {team_name} in season {normalized_season} after applying minimum attempt filters for {stat_column}."
+    # Leaders are precomputed with the FG_PCT, FT_PCT, FG3_PCT minimum attempt filters applied
+    leader_row = season_frame.team_leader(team_id, stat_column)
 
-    # Sort to find the leader
-    # For percentage stats, ensure the player has a reasonable number of attempts (already partly handled)
-    leader_df = team_player_stats_df.sort_values(by=stat_column, ascending=False).head(1)
-
-    if leader_df.empty:
-        return f"❌ Could not determine a leader for {stat_name} for {team_name} in {normalized_season}."
+    if leader_row is None:
+         return f"❌ No players found for {team_name} in season {normalized_season} after applying minimum attempt filters for {stat_column}."
 
-    leader_name = leader_df.iloc[0]['PLAYER_NAME']
-    leader_stat_value = leader_df.iloc[0][stat_column]
+    leader_name = leader_row['PLAYER_NAME']
+    leader_stat_value = leader_row[stat_column]
     
     # Create a small DataFrame for consistent output
     result_data = {'PLAYER_NAME': [leader_name], stat_column: [leader_stat_value]}
@@ -258,112 +223,301 @@ def get_team_leader(team_name: str, stat_name: str, season: str):
     result_df.rename(columns={stat_column: stat_name.upper()}, inplace=True)
     return result_df
 
+def _record_row(team_standings: pd.Series, team_name: str) -> dict:
+    record = team_standings.get('Record', 'N/A')
+    # Fall back to parsing 'Record' where WINS / LOSSES are missing
+    wins = team_standings.get('WINS', record.split('-')[0] if record != 'N/A' else 'N/A')
+    losses = team_standings.get('LOSSES', record.split('-')[1] if record != 'N/A' and '-' in record else 'N/A')
+    win_pct = team_standings.get('WinPCT', 'N/A')
+    # Use 'ConferenceRank' if available, otherwise 'PlayoffRank'
+    conference_rank = team_standings.get('ConferenceRank', team_standings.get('PlayoffRank', 'N/A'))
+    team_city = team_standings.get('TeamCity', team_name.split()[:-1] if len(team_name.split()) > 1 else team_name) # Guess city
+    actual_team_name = team_standings.get('TeamName', team_name.split()[-1]) # Guess name part
+    return {
+        'TEAM': f"{team_city} {actual_team_name}",
+        'W': wins,
+        'L': losses,
+        'PCT': f"{win_pct:.3f}" if pd.api.types.is_float(win_pct) else win_pct,
+        'CONF_RANK': conference_rank
+    }
+
+
+def _standings_snapshot(season: str):
+    # Returns the snapshot, or an error message
+    try:
+        snapshot = get_standings(season)
+    except Exception as e:
+        return f"❌ Error fetching standings data: {e}"
+    if snapshot.df.empty:
+        return f"❌ No standings data found for season {season}."
+    return snapshot
+
+
+@timed()
 def get_team_record(team_name: str, season: str):
     normalized_season = normalize_season(season)
-    team_id = get_team_id(team_name)
+    team_id = get_team_id(team_name, normalized_season)
 
     if not team_id:
         return f"❌ Team '{team_name}' not found."
 
-    # Season format for LeagueStandingsV3 is YYYY-YY, e.g., 2023-24
-    # normalize_season should already provide this format.
+    # One standings snapshot per season, kept in memory and indexed by TeamID
+    snapshot = _standings_snapshot(normalized_season)
+    if isinstance(snapshot, str):
+        return snapshot
 
-    try:
-        standings = leaguestandingsv3.LeagueStandingsV3(season=normalized_season)
-        # The first DataFrame in the result set usually contains the standings data.
-        standings_df = standings.get_data_frames()[0] 
-    except Exception as e:
-        return f"❌ Error fetching standings data: {e}"
+    team_standings = snapshot.team(team_id)
+    if team_standings is None:
+        return f"❌ Could not find standings for {team_name} (ID: {team_id}) in season {normalized_season}."
+
+    return pd.DataFrame([_record_row(team_standings, team_name)])
+
+
+@timed()
+def get_team_records(team_names: list, season: str):
+    normalized_season = normalize_season(season)
+    team_ids = {team_name: get_team_id(team_name, normalized_season) for team_name in team_names}
+    unknown = [team_name for team_name, team_id in team_ids.items() if not team_id]
+    if unknown:
+        return f"❌ Team(s) not found: {', '.join(unknown)}."
+
+    snapshot = _standings_snapshot(normalized_season)
+    if isinstance(snapshot, str):
+        return snapshot
+
+    rows = []
+    for team_name, team_id in team_ids.items():
+        team_standings = snapshot.team(team_id)
+        if team_standings is None:
+            return f"❌ Could not find standings for {team_name} (ID: {team_id}) in season {normalized_season}."
+        rows.append(_record_row(team_standings, team_name))
+    return pd.DataFrame(rows)
 
-    if standings_df.empty:
-        return f"❌ No standings data found for season {normalized_season}."
 
-    team_standings = standings_df[standings_df['TeamID'] == team_id]
+CONFERENCES = {"east": "East", "eastern": "East", "west": "West", "western": "West"}
 
-    if team_standings.empty:
+
+@timed()
+def get_conference_standings(conference: str, season: str):
+    normalized_season = normalize_season(season)
+    if conference:
+        name = CONFERENCES.get(conference.lower().replace("conference", "").strip())
+        if name is None:
+            return f"❌ Unknown conference '{conference}'. Use East or West."
+        conferences = [name]
+    else:
+        conferences = ["East", "West"]
+
+    snapshot = _standings_snapshot(normalized_season)
+    if isinstance(snapshot, str):
+        return snapshot
+
+    tables = []
+    for name in conferences:
+        teams = snapshot.conference(name)
+        table = pd.DataFrame({
+            'CONF': name,
+            'RANK': teams['PlayoffRank'].to_numpy() if 'PlayoffRank' in teams.columns else range(1, len(teams) + 1),
+            'TEAM': (teams['TeamCity'] + ' ' + teams['TeamName']).to_numpy(),
+            'W': teams['WINS'].to_numpy(),
+            'L': teams['LOSSES'].to_numpy(),
+            'PCT': teams['WinPCT'].map(lambda pct: f"{pct:.3f}").to_numpy(),
+            'GB': teams['ConferenceGamesBack'].to_numpy(),
+        })
+        tables.append(table)
+    result_df = pd.concat(tables, ignore_index=True)
+    return result_df if len(conferences) > 1 else result_df.drop(columns=['CONF'])
+
+
+@timed()
+def get_games_back(team_name: str, season: str):
+    normalized_season = normalize_season(season)
+    team_id = get_team_id(team_name, normalized_season)
+    if not team_id:
+        return f"❌ Team '{team_name}' not found."
+
+    snapshot = _standings_snapshot(normalized_season)
+    if isinstance(snapshot, str):
+        return snapshot
+
+    team_standings = snapshot.team(team_id)
+    if team_standings is None:
         return f"❌ Could not find standings for {team_name} (ID: {team_id}) in season {normalized_season}."
 
-    # Extract relevant information
-    record = team_standings.iloc[0].get('Record', 'N/A')
-    conf_rank = team_standings.iloc[0].get('ConferenceRecord', 'N/A').split('-')[0] # often 'W-L in Conf', take W
-    # Or more directly, some versions have 'PlayoffRank' or 'ConferenceRank'
-    # Let's check for a more direct conference rank column if available.
-    # Common column names: 'ConferenceRank', 'PlayoffRank', 'ClinchIndicator' (might show rank)
-    # For simplicity, we will stick to common ones or construct from Record.
-    
-    # We need TEAM, W, L, CONF_RANK, (maybe PCT)
-    wins = team_standings.iloc[0].get('WINS', record.split('-')[0] if record != 'N/A' else 'N/A')
-    losses = team_standings.iloc[0].get('LOSSES', record.split('-')[1] if record != 'N/A' and '-' in record else 'N/A')
-    win_pct = team_standings.iloc[0].get('WinPCT', 'N/A')
-    # Use 'ConferenceRank' if available, otherwise parse from 'ConferenceRecord'
-    conference_rank = team_standings.iloc[0].get('ConferenceRank', 
-                                                 team_standings.iloc[0].get('PlayoffRank', 'N/A'))
-    team_city = team_standings.iloc[0].get('TeamCity', team_name.split()[:-1] if len(team_name.split()) > 1 else team_name) # Guess city
-    actual_team_name = team_standings.iloc[0].get('TeamName', team_name.split()[-1]) # Guess name part
-    display_name = f"{team_city} {actual_team_name}"
+    leader = snapshot.conference(team_standings['Conference']).iloc[0]
+    row = _record_row(team_standings, team_name)
+    row.update({
+        'CONF': team_standings['Conference'],
+        'GB': team_standings['ConferenceGamesBack'],
+        'CONF_LEADER': f"{leader['TeamCity']} {leader['TeamName']}",
+    })
+    return pd.DataFrame([row])
 
-    result_data = [{
-        'TEAM': display_name,
-        'W': wins,
-        'L': losses,
-        'PCT': f"{win_pct:.3f}" if isinstance(win_pct, float) else win_pct,
-        'CONF_RANK': conference_rank
-    }]
-    
-    return pd.DataFrame(result_data)
 
+@timed()
 def get_league_average_for_stat(stat_name: str, season: str, season_type: str = "Regular Season"):
     normalized_season = normalize_season(season)
     stat_column = stat_name_to_column(stat_name)
 
     try:
-        all_player_stats_df = leaguedashplayerstats.LeagueDashPlayerStats(
-            season=normalized_season,
-            season_type_all_star=season_type,
-            per_mode_detailed="PerGame" if "per game" in stat_name.lower() or "_per_game" in stat_name.lower() else "Totals"
-        ).get_data_frames()[0]
+        season_frame = get_season_frame(normalized_season, per_mode=per_mode_for_stat(stat_name), season_type=season_type)
     except Exception as e:
         return f"❌ Error fetching league-wide player stats: {e}"
 
-    if all_player_stats_df.empty:
+    if season_frame.df.empty:
         return f"❌ No league-wide player stats found for season {normalized_season} ({season_type})."
 
-    if stat_column not in all_player_stats_df.columns:
+    if stat_column not in season_frame.df.columns:
         return f"❌ Stat '{stat_name}' (mapped to '{stat_column}') not found in league data."
 
-    # Apply minimum attempt filters for percentage stats to get a meaningful average
-    # These thresholds might need adjustment for a good league average calculation
-    filtered_stats_df = all_player_stats_df.copy()
-    if stat_column == "FG3_PCT":
-        # For league average, consider a lower attempt threshold than for "top players"
-        # e.g., players who have attempted at least 1 three-pointer per team game played by their team on average
-        # Or a simpler fixed number like 50-82 attempts for the whole season.
-        filtered_stats_df = filtered_stats_df[filtered_stats_df["FG3A"] >= 50] 
-    elif stat_column == "FT_PCT":
-        filtered_stats_df = filtered_stats_df[filtered_stats_df["FTA"] >= 50]
-    elif stat_column == "FG_PCT":
-        filtered_stats_df = filtered_stats_df[filtered_stats_df["FGA"] >= 100]
-    
-    if filtered_stats_df.empty:
+    # Summaries are computed for every stat when the season is loaded, with minimum
+    # attempt filters (50 3PA, 50 FTA, 100 FGA) applied to the percentage stats
+    summary = season_frame.league_summary(stat_column)
+    if summary is None:
+        return f"❌ Stat column '{stat_column}' is not numeric, cannot calculate average."
+
+    if summary["count"] == 0:
         return f"❌ No players met the minimum criteria for calculating average for '{stat_name}' in {normalized_season} ({season_type})."
 
-    # Calculate the mean of the specified stat column
-    # Ensure the column is numeric before calculating mean
-    if pd.api.types.is_numeric_dtype(filtered_stats_df[stat_column]):
-        league_average = filtered_stats_df[stat_column].mean()
-    else:
-        return f"❌ Stat column '{stat_column}' is not numeric, cannot calculate average."
+    league_average = summary["mean"]
 
     # Format for display
     result_data = [{
         'STATISTIC': stat_name.upper(),
-        'LEAGUE_AVERAGE': f"{league_average:.3f}" if isinstance(league_average, float) else league_average,
+        'LEAGUE_AVERAGE': f"{league_average:.3f}" if pd.api.types.is_float(league_average) else league_average,
         'SEASON': normalized_season,
         'SEASON_TYPE': season_type,
-        'PLAYERS_INCLUDED_IN_AVG': len(filtered_stats_df)
+        'PLAYERS_INCLUDED_IN_AVG': summary["count"]
     }]
     return pd.DataFrame(result_data)
 
+
+LEAGUE_COMPARISON_STATS = ["PTS", "REB", "AST", "STL", "BLK", "FG_PCT", "FG3_PCT", "FT_PCT"]
+
+
+@timed()
+def compare_to_league_average(player_name: str, stat_names: list, season: str, per_mode: str = "PerGame", season_type: str = "Regular Season"):
+    """
+    One row per stat: the player's number next to the league's mean, median and best.
+    Percentage stats are compared with the league's qualified shooters.
+    """
+    normalized_season = normalize_season(season)
+    if per_mode not in ("Totals", "PerGame"):
+        return f"❌ Unknown per_mode '{per_mode}'. Use Totals or PerGame."
+    stat_columns = list(dict.fromkeys(stat_name_to_column(stat) for stat in stat_names)) or LEAGUE_COMPARISON_STATS
+
+    player_id = get_player_id(player_name)
+    if not player_id:
+        return f"❌ Player '{player_name}' not found."
+
+    try:
+        season_frame = get_season_frame(normalized_season, per_mode=per_mode, season_type=season_type)
+        # Attempt minimums are season totals, so percentages are always judged on Totals
+        totals_frame = season_frame if per_mode == "Totals" else None
+        if any(col.endswith("_PCT") for col in stat_columns):
+            totals_frame = totals_frame or get_season_frame(normalized_season, per_mode="Totals", season_type=season_type)
+    except Exception as e:
+        return f"❌ Error fetching league-wide player stats: {e}"
+
+    row = season_frame.row_of_player.get(player_id)
+    if row is None:
+        return f"❌ No stats found for {player_name} in {normalized_season} ({season_type})."
+
+    rows = []
+    for stat in stat_columns:
+        frame = totals_frame if stat.endswith("_PCT") else season_frame
+        summary = frame.league_summary(stat)
+        if summary is None:
+            return f"❌ Stat '{stat}' not available."
+        value = frame.df.iloc[frame.row_of_player[player_id]][stat]
+        rows.append({
+            'STAT': stat,
+            player_name: round(float(value), 3) if pd.notna(value) else "N/A",
+            'LEAGUE_AVERAGE': round(summary["mean"], 3),
+            'DIFFERENCE': round(float(value) - summary["mean"], 3) if pd.notna(value) else "N/A",
+            'LEAGUE_MEDIAN': round(summary["median"], 3),
+            'LEAGUE_BEST': round(summary["max"], 3),
+        })
+    return pd.DataFrame(rows)
+
+@timed()
+def get_player_rank(player_name: str, season: str, stat_names: list | None = None, per_mode: str = "Totals", season_type: str = "Regular Season"):
+    """
+    The player's league rank and percentile in each stat, or in the main box-score
+    stats when none are named. Rank 1 is the highest value, or the lowest for
+    turnovers and fouls; percentage stats only rank players with enough attempts
+    (100 3PA, 100 FTA, 300 FGA).
+    """
+    normalized_season = normalize_season(season)
+    if per_mode not in ("Totals", "PerGame"):
+        return f"❌ Unknown per_mode '{per_mode}'. Use Totals or PerGame."
+
+    player_id = get_player_id(player_name)
+    if not player_id:
+        return f"❌ Player '{player_name}' not found."
+
+    try:
+        season_frame = get_season_frame(normalized_season, per_mode=per_mode, season_type=season_type)
+    except Exception as e:
+        return f"❌ Error fetching league-wide player stats: {e}"
+
+    stat_columns = list(dict.fromkeys(stat_name_to_column(stat) for stat in stat_names or [])) or LEAGUE_COMPARISON_STATS
+    for stat in stat_columns:
+        if stat not in season_frame.rank_positions:
+            return f"❌ Stat '{stat}' not available."
+
+    # Attempt minimums are season totals, so qualified percentages are always ranked on Totals
+    qualified = [col for col in stat_columns if col in LEAGUE_QUALIFIERS]
+    totals_frame = season_frame
+    if qualified and per_mode != "Totals":
+        try:
+            totals_frame = get_season_frame(normalized_season, per_mode="Totals", season_type=season_type)
+        except Exception as e:
+            return f"❌ Error fetching league-wide player stats: {e}"
+
+    # Binary searches over each stat's sorted values, precomputed when the season was loaded
+    counting = season_frame.ranks_of(player_id, [col for col in stat_columns if col not in LEAGUE_QUALIFIERS])
+    percentages = totals_frame.ranks_of(player_id, qualified)
+    if counting is None or percentages is None:
+        return f"❌ No stats found for {player_name} in {normalized_season} ({season_type})."
+
+    rows = []
+    for stat in stat_columns:
+        ranked = counting.get(stat) if stat in counting else percentages.get(stat)
+        if ranked is None:
+            rows.append({'STAT': stat, 'VALUE': "N/A", 'RANK': "N/A", 'RANKED_PLAYERS': "N/A", 'PERCENTILE': "N/A"})
+            continue
+        value, rank, total, percentile = ranked
+        rows.append({'STAT': stat, 'VALUE': round(float(value), 3), 'RANK': rank, 'RANKED_PLAYERS': total, 'PERCENTILE': round(percentile, 1)})
+    return pd.DataFrame(rows)
+
+def recent_games(player_id: int, limit: int, season_type: str = "Regular Season", columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    The player's last `limit` games, newest first. The season in progress is read
+    first; only when it has fewer than `limit` games does this walk back season by
+    season through their career. Adds a SEASON column.
+    """
+    season = current_season()
+    log = get_player_game_log_frame(player_id, season, season_type, columns=columns)
+    logs = [log.head(limit).assign(SEASON=season)] if not log.empty else []
+    found = len(logs[0]) if logs else 0
+    if found >= limit:
+        return logs[0]
+
+    career_df = get_player_career_stats(player_id, per_mode="PerGame", columns=["SEASON_ID"])
+    earlier = sorted((s for s in set(career_df["SEASON_ID"]) if s < season), reverse=True) if not career_df.empty else []
+    for season in earlier:
+        log = get_player_game_log_frame(player_id, season, season_type, columns=columns)
+        if log.empty:
+            continue
+        logs.append(log.head(limit - found).assign(SEASON=season))
+        found += len(logs[-1])
+        if found >= limit:
+            break
+    return pd.concat(logs, ignore_index=True) if logs else pd.DataFrame(columns=["SEASON"] + (columns or []))
+
+
+@timed()
 def get_player_game_log(player_name: str, season: str, limit: int = 5, season_type: str = "Regular Season"):
     player_id = get_player_id(player_name)
     if not player_id:
@@ -371,24 +525,28 @@ def get_player_game_log(player_name: str, season: str, limit: int = 5, season_ty
 
     normalized_season = normalize_season(season)
 
+    columns_to_display = ['GAME_DATE', 'MATCHUP', 'WL', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'FG_PCT', 'FG3_PCT', 'FT_PCT']
+
+    # No season means the player's most recent games, across season boundaries
+    career = not normalized_season or normalized_season.lower() == "career"
     try:
-        gamelog = playergamelog.PlayerGameLog(
-            player_id=player_id,
-            season=normalized_season,
-            season_type_all_star=season_type
-        )
-        gamelog_df = gamelog.get_data_frames()[0]
+        if career:
+            gamelog_df = recent_games(player_id, limit, season_type, columns=columns_to_display)
+            columns_to_display = ['SEASON'] + columns_to_display
+        else:
+            gamelog_df = get_player_game_log_frame(player_id, normalized_season, season_type, columns=columns_to_display)
     except Exception as e:
         return f"❌ Error fetching game log for {player_name}: {e}"
 
     if gamelog_df.empty:
+        if career:
+            return f"❌ No game log data found for {player_name} ({season_type})."
         return f"❌ No game log data found for {player_name} in season {normalized_season} ({season_type})."
 
     # Select and format relevant columns
     # The API returns most recent games first, so head(limit) gets the last N games.
     gamelog_df_limited = gamelog_df.head(limit)
     
-    columns_to_display = ['GAME_DATE', 'MATCHUP', 'WL', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'FG_PCT', 'FG3_PCT', 'FT_PCT']
     # Ensure all requested columns exist, create them with N/A if not (though they usually do for PlayerGameLog)
     for col in columns_to_display:
         if col not in gamelog_df_limited.columns:
@@ -399,7 +557,7 @@ def get_player_game_log(player_name: str, season: str, limit: int = 5, season_ty
     # Format date and percentages for better readability
     if 'GAME_DATE' in result_df.columns:
         try:
-            result_df['GAME_DATE'] = pd.to_datetime(result_df['GAME_DATE'], errors='coerce').dt.strftime('%Y-%m-%d')
+            result_df['GAME_DATE'] = game_dates(result_df['GAME_DATE']).dt.strftime('%Y-%m-%d')
         except Exception:
             pass # Keep original if formatting fails
             
@@ -409,37 +567,230 @@ def get_player_game_log(player_name: str, season: str, limit: int = 5, season_ty
 
     return result_df
 
-def compare_players(player_names: list, stat_names: list, season: str, per_game: bool = False):
-    season = normalize_season(season)
-    stat_columns = [stat_name_to_column(stat) for stat in stat_names]
+# Columns that read the same in Totals and PerGame mode; everything else is divided by GP
+PER_GAME_UNCHANGED = {"AGE", "GP", "W", "L"}
 
-    # Fetch all player stats from the league
-    per_mode = "PerGame" if per_game else "Totals"
-    all_stats = leaguedashplayerstats.LeagueDashPlayerStats(
-        season=season,
-        per_mode_detailed=per_mode
-    ).get_data_frames()[0]
+COMPARE_MODES = {"Totals": ["Totals"], "PerGame": ["PerGame"], "Both": ["Totals", "PerGame"]}
 
 
-    # Filter for the requested players
-    filtered = all_stats[all_stats["PLAYER_NAME"].isin(player_names)]
+def resolve_seasons(season) -> list[str]:
+    """
+    Accepts one season, a range like "last 3 seasons", or a list of either,
+    and returns normalized seasons in chronological order.
+    """
+    specs = season if isinstance(season, (list, tuple)) else [season]
+    seasons = []
+    for spec in specs:
+        for resolved in parse_season_range(spec) or [normalize_season(spec)]:
+            if resolved not in seasons:
+                seasons.append(resolved)
+    return sorted(seasons)
+
+
+def per_game_frame(totals: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    # PerGame numbers derived from Totals, so one fetch serves both modes
+    per_game = totals[columns].astype("float64")
+    counting = [col for col in columns if col not in PER_GAME_UNCHANGED and not col.endswith("_PCT")]
+    games = totals["GP"].where(totals["GP"] > 0)
+    per_game[counting] = per_game[counting].div(games, axis=0)
+    return per_game
+
+
+@timed()
+def compare_players(player_names: list, stat_names: list, season, per_game: bool = False, per_mode: str | None = None):
+    """
+    One row per stat (and per season and mode, when there are several) and one
+    column per player. season may be a list or a range like "last 3 seasons";
+    per_mode is "Totals", "PerGame" or "Both", and overrides per_game.
+    """
+    seasons = resolve_seasons(season)
+    modes = COMPARE_MODES.get(per_mode or ("PerGame" if per_game else "Totals"))
+    if modes is None:
+        return f"❌ Unknown per_mode '{per_mode}'. Use Totals, PerGame or Both."
+    stat_columns = list(dict.fromkeys(stat_name_to_column(stat) for stat in stat_names))
+
+    # Match players by ID, so spelling, accents and suffixes don't matter
+    player_ids = {player: get_player_id(player) for player in player_names}
+    wanted_ids = list(dict.fromkeys(pid for pid in player_ids.values() if pid))
+
+    # values[stat, season, mode, player]; players missing from a season stay NaN
+    values = np.full((len(stat_columns), len(seasons), len(modes), len(wanted_ids)), np.nan)
+    integer_stats = set()
+    found = False
+    for s, season_id in enumerate(seasons):
+        # Totals for the whole league, already in memory and indexed by player ID
+        season_frame = get_season_frame(season_id, per_mode="Totals")
+        for stat in stat_columns:
+            if stat not in season_frame.df.columns:
+                return f"❌ Stat '{stat}' not available."
+            if pd.api.types.is_integer_dtype(season_frame.df[stat]):
+                integer_stats.add(stat)
+        slots = [p for p, player_id in enumerate(wanted_ids) if player_id in season_frame.row_of_player]
+        if not slots:
+            continue
+        found = True
+        totals = season_frame.df.iloc[[season_frame.row_of_player[wanted_ids[p]] for p in slots]]
+        for m, mode in enumerate(modes):
+            block = totals[stat_columns] if mode == "Totals" else per_game_frame(totals, stat_columns)
+            values[:, s, m, slots] = block.to_numpy(dtype="float64", na_value=np.nan).T
+
+    if not found:
+        return f"❌ Could not find any of the players in {', '.join(seasons) or 'that season'}."
+
+    # One row per (stat, season, mode), one column per player in the order they were asked for
+    by_id = values.round(2).reshape(-1, len(wanted_ids))
+    missing = np.isnan(by_id)
+    # Counting stats keep their integer Totals ("1000", not "1000.0")
+    whole_rows = np.repeat([stat in integer_stats for stat in stat_columns], len(seasons) * len(modes)) \
+        & np.tile([mode == "Totals" for mode in modes], len(stat_columns) * len(seasons))
+    whole = np.where(missing, 0, by_id).astype(np.int64).astype(object)
+    cells = np.where(whole_rows[:, None], whole, by_id.astype(object))
+    cells[missing] = "N/A"
+    slot_of = {player_id: p for p, player_id in enumerate(wanted_ids)}
+
+    table = {"STAT": np.repeat(stat_columns, len(seasons) * len(modes))}
+    if len(seasons) > 1:
+        table["SEASON"] = np.tile(np.repeat(seasons, len(modes)), len(stat_columns))
+    if len(modes) > 1:
+        table["MODE"] = np.tile(modes, len(stat_columns) * len(seasons))
+    for player, player_id in player_ids.items():
+        table[player] = cells[:, slot_of[player_id]] if player_id else "N/A"
+    return pd.DataFrame(table)
+
+
+NUMBER_WORDS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+DAYS_PER_UNIT = {"day": 1, "week": 7, "month": 30}
+
+
+def parse_date_range(date_range: str, today: date | None = None) -> tuple[date, date] | None:
+    """
+    "last week", "past 10 days", "yesterday", "2024-03-01" or "2024-03-01 to 2024-03-07"
+    -> (first day, last day), both included.
+    """
+    today = today or datetime.now().date()
+    text = date_range.strip().lower()
+    explicit = [datetime.strptime(day, "%Y-%m-%d").date() for day in re.findall(r"\d{4}-\d{2}-\d{2}", text)]
+    if explicit:
+        return min(explicit), max(explicit)
+    if text == "today":
+        return today, today
+    if text == "yesterday":
+        return today - timedelta(days=1), today - timedelta(days=1)
+    match = re.match(r"^(?:the )?(?:last|past|this) (?:(\w+) )?(day|week|month)s?$", text)
+    if not match:
+        return None
+    number = match.group(1) or "1"
+    number = int(number) if number.isdigit() else NUMBER_WORDS.get(number)
+    if not number:
+        return None
+    return today - timedelta(days=number * DAYS_PER_UNIT[match.group(2)]), today
 
-    if filtered.empty:
-        return f"❌ Could not find one or more players in the current season."
 
-    # Build a comparison table
-    data = []
-    for stat in stat_columns:
-        if stat not in filtered.columns:
-            return f"❌ Stat '{stat}' not available."
-        row = [stat]
-        for player in player_names:
-            player_row = filtered[filtered["PLAYER_NAME"] == player]
-            if not player_row.empty:
-                row.append(round(player_row[stat].values[0], 2))
-            else:
-                row.append("N/A")
-        data.append(row)
-
-    columns = ["STAT"] + player_names
-    return pd.DataFrame(data, columns=columns)
+def season_for_date(day: date) -> str:
+    # Seasons start in October; anything from July on belongs to the next one
+    start_year = day.year if day.month >= 7 else day.year - 1
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def _games_table(games: pd.DataFrame, stat_column: str) -> pd.DataFrame:
+    result_df = games[['PLAYER_NAME', 'GAME_DATE', 'MATCHUP', 'WL', stat_column]].copy()
+    result_df['GAME_DATE'] = result_df['GAME_DATE'].dt.strftime('%Y-%m-%d')
+    return result_df.reset_index(drop=True)
+
+
+@timed()
+def get_best_games(stat_name: str, season: str = "", date_range: str = "", limit: int = 10, season_type: str = "Regular Season"):
+    stat_column = stat_name_to_column(stat_name)
+
+    window = None
+    if date_range:
+        window = parse_date_range(date_range)
+        if window is None:
+            return f"❌ Could not understand the dates '{date_range}'. Try 'last week', 'last 10 days' or '2024-03-01 to 2024-03-07'."
+    normalized_season = normalize_season(season) if season else season_for_date(window[1]) if window else ""
+    if not normalized_season:
+        return "❌ Give a season or a date range for the best games."
+
+    try:
+        league_games = get_league_games(normalized_season, season_type)
+    except Exception as e:
+        return f"❌ Error fetching league game logs: {e}"
+
+    # Games in a date range are a binary search over the date-sorted season log
+    games = league_games.between(*window) if window else league_games.df
+    period = f"{window[0]} to {window[1]}" if window else normalized_season
+    if games.empty:
+        return f"❌ No games found for {period} ({season_type})."
+    if stat_column not in games.columns:
+        return f"❌ Stat '{stat_name}' (mapped to '{stat_column}') not found in game logs."
+
+    return _games_table(games.nlargest(limit, stat_column, keep="first"), stat_column)
+
+
+@timed()
+def get_games_against(team_name: str, season: str, stat_name: str = "points", minimum: float = 40, season_type: str = "Regular Season"):
+    normalized_season = normalize_season(season)
+    team_id = get_team_id(team_name, normalized_season)
+    if not team_id:
+        return f"❌ Team '{team_name}' not found."
+    stat_column = stat_name_to_column(stat_name)
+
+    try:
+        league_games = get_league_games(normalized_season, season_type)
+    except Exception as e:
+        return f"❌ Error fetching league game logs: {e}"
+
+    games = league_games.games_against(team_id)
+    if games.empty:
+        return f"❌ No games against {team_name} found in season {normalized_season} ({season_type})."
+    if stat_column not in games.columns:
+        return f"❌ Stat '{stat_name}' (mapped to '{stat_column}') not found in game logs."
+
+    hits = games[games[stat_column] >= minimum].sort_values([stat_column, 'GAME_DATE'], ascending=[False, True], kind="stable")
+    if hits.empty:
+        return f"❌ No player had {minimum:g}+ {stat_name} against {team_name} in season {normalized_season} ({season_type})."
+    return _games_table(hits, stat_column)
+
+
+HEAD_TO_HEAD_AVERAGES = ['MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV']
+HEAD_TO_HEAD_PERCENTAGES = {'FG_PCT': ('FGM', 'FGA'), 'FG3_PCT': ('FG3M', 'FG3A'), 'FT_PCT': ('FTM', 'FTA')}
+
+
+@timed()
+def get_head_to_head(player_name: str, team_name: str, season: str, season_type: str = "Regular Season"):
+    player_id = get_player_id(player_name)
+    if not player_id:
+        return f"❌ Player '{player_name}' not found."
+    normalized_season = normalize_season(season)
+    team_id = get_team_id(team_name, normalized_season)
+    if not team_id:
+        return f"❌ Team '{team_name}' not found."
+
+    try:
+        league_games = get_league_games(normalized_season, season_type)
+    except Exception as e:
+        return f"❌ Error fetching league game logs: {e}"
+
+    games = league_games.player_games(player_id)
+    if games.empty:
+        return f"❌ No game log data found for {player_name} in season {normalized_season} ({season_type})."
+    against = (games['OPPONENT_ID'] == team_id).to_numpy()
+    if not against.any():
+        return f"❌ {player_name} did not play {team_name} in season {normalized_season} ({season_type})."
+
+    opponent = games.loc[against, 'OPPONENT'].iloc[0]
+    averages = [col for col in HEAD_TO_HEAD_AVERAGES if col in games.columns]
+    rows = []
+    for split, mask in ((f"vs {opponent}", against), ("vs others", ~against)):
+        if not mask.any():
+            continue
+        split_games = games[mask]
+        wins = int((split_games['WL'] == 'W').sum())
+        row = {'PLAYER_NAME': player_name, 'SPLIT': split, 'GP': len(split_games), 'W': wins, 'L': len(split_games) - wins}
+        row.update(split_games[averages].mean().round(1))
+        for pct, (made, attempted) in HEAD_TO_HEAD_PERCENTAGES.items():
+            if made in games.columns and attempted in games.columns:
+                attempts = split_games[attempted].sum()
+                row[pct] = round(split_games[made].sum() / attempts, 3) if attempts else None
+        rows.append(row)
+    return pd.DataFrame(rows)
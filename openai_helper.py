@@ -1,14 +1,78 @@
-from openai import OpenAI
 import json
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from types import SimpleNamespace
+from intent_parser import parse_query_locally, record_parse
+from answer_store import canonical_stat_name, seeded_explanation
+from llm_cache import PersistentLRUCache, canonicalize_query, prompt_version
+from metrics import count_tokens, record_stage, stage
 
-load_dotenv()  # Loads from .env
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Built on first use: importing the openai SDK takes most of a second, and many
+# questions are answered without it
+_client = None
+_async_client = None  # Used by engine.QueryEngine
+_client_lock = threading.Lock()
 
 
-def get_stat_explanation_with_gpt(stat_name: str) -> str:
-    prompt = f"""
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from dotenv import load_dotenv
+                from openai import OpenAI
+
+                load_dotenv()  # Loads from .env
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                from dotenv import load_dotenv
+                from openai import AsyncOpenAI
+
+                load_dotenv()
+                _async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_client
+
+
+async def _stream_completion(request: dict, stage_name: str, cache: PersistentLRUCache, cache_key: str):
+    """
+    Yields a completion's text as it arrives, then caches the full answer if the
+    stream finished and was not empty.
+    The time to the first token is recorded as the "<stage_name>.first_token" stage.
+    """
+    start = time.perf_counter()
+    parts = []
+    usage = None
+    with stage(stage_name):
+        stream = await get_async_client().chat.completions.create(
+            **request,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage  # Sent on the last chunk, which has no choices
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            if not parts:
+                record_stage(f"{stage_name}.first_token", start, time.perf_counter() - start)
+            parts.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+    # Only reached when the stream ran to its end; an aborted stream leaves the cache alone
+    count_tokens(SimpleNamespace(usage=usage), request["model"])
+    answer = "".join(parts).strip()
+    if answer:
+        cache.set(cache_key, answer)
+
+
+STAT_EXPLANATION_PROMPT = """
     You are an expert NBA analyst. Explain the basketball statistic "{stat_name}" in a clear and concise way. 
     Describe what it measures, how it's generally calculated (if common knowledge or simple), and what a high or low value might indicate. 
     Keep the explanation suitable for a knowledgeable basketball fan who may not know this specific term.
@@ -18,26 +82,92 @@ def get_stat_explanation_with_gpt(stat_name: str) -> str:
 
     Now, explain "{stat_name}":
     """
+STAT_EXPLANATION_MODEL = "gpt-4o" # Or your preferred model for explanations
+
+explanation_cache = PersistentLRUCache(
+    namespace="stat_explanation",
+    version=prompt_version(STAT_EXPLANATION_PROMPT, STAT_EXPLANATION_MODEL),
+    max_entries=int(os.getenv("CHAT_NBA_ANSWER_CACHE_SIZE", "1000")),
+)
+
+
+def _completion_request(model: str, temperature: float, prompt: str) -> dict:
+    return {"model": model, "temperature": temperature, "messages": [{"role": "user", "content": prompt}]}
+
+
+def _answer_from_response(response, model: str, cache: PersistentLRUCache, cache_key: str) -> str:
+    count_tokens(response, model)
+    answer = response.choices[0].message.content.strip()
+    if answer:
+        cache.set(cache_key, answer)
+    return answer
+
+
+def _cached_explanation(stat_name: str) -> tuple[str, str | None]:
+    # Bundled explanations first, then answers GPT already gave
+    cache_key = canonical_stat_name(stat_name)
+    explanation = seeded_explanation(stat_name)
+    if explanation is None:
+        explanation = explanation_cache.get(cache_key)
+    return cache_key, explanation
+
+
+def _explanation_request(stat_name: str) -> dict:
+    # Slightly more creative for explanations
+    return _completion_request(STAT_EXPLANATION_MODEL, 0.2, STAT_EXPLANATION_PROMPT.format(stat_name=stat_name))
+
+
+def _explanation_failed(stat_name: str, e: Exception) -> str:
+    print(f"⚠️ Error getting explanation from GPT for {stat_name}:", e)
+    return f"Sorry, I couldn't fetch an explanation for {stat_name} at the moment."
+
+
+def get_stat_explanation_with_gpt(stat_name: str) -> str:
+    cache_key, cached = _cached_explanation(stat_name)
+    if cached is not None:
+        return cached
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o", # Or your preferred model for explanations
-            temperature=0.2, # Slightly more creative for explanations
-            messages=[{"role": "user", "content": prompt}]
-        )
-        explanation = response.choices[0].message.content
-        return explanation.strip()
+        with stage("llm.explain_stat"):
+            response = get_client().chat.completions.create(**_explanation_request(stat_name))
+        return _answer_from_response(response, STAT_EXPLANATION_MODEL, explanation_cache, cache_key)
     except Exception as e:
-        print(f"⚠️ Error getting explanation from GPT for {stat_name}:", e)
-        return f"Sorry, I couldn't fetch an explanation for {stat_name} at the moment."
+        return _explanation_failed(stat_name, e)
 
 
-def answer_historical_nba_fact_with_gpt(user_query_details: dict) -> str:
+async def get_stat_explanation_with_gpt_async(stat_name: str) -> str:
+    cache_key, cached = _cached_explanation(stat_name)
+    if cached is not None:
+        return cached
+    try:
+        with stage("llm.explain_stat"):
+            response = await get_async_client().chat.completions.create(**_explanation_request(stat_name))
+        return _answer_from_response(response, STAT_EXPLANATION_MODEL, explanation_cache, cache_key)
+    except Exception as e:
+        return _explanation_failed(stat_name, e)
+
+
+async def stream_stat_explanation(stat_name: str):
     """
-    Answers a historical NBA factual question using GPT.
+    Like get_stat_explanation_with_gpt_async, but yields the explanation as it is generated.
+    Seeded and cached explanations come back as a single piece.
     """
-    original_question = user_query_details.get("original_question", "that specific NBA historical fact")
+    cache_key, cached = _cached_explanation(stat_name)
+    if cached is not None:
+        yield cached
+        return
+
+    streamed = False
+    try:
+        async for token in _stream_completion(_explanation_request(stat_name), "llm.explain_stat", explanation_cache, cache_key):
+            streamed = True
+            yield token
+    except Exception as e:
+        failed = _explanation_failed(stat_name, e)
+        if not streamed:
+            yield failed
 
-    prompt = f"""\
+
+HISTORICAL_FACT_PROMPT = """\
 You are an NBA historian. Provide a concise answer to the following NBA historical question:
 "{original_question}"
 
@@ -47,21 +177,82 @@ For example, if the question is "how many teams have come back from 3-1 down in
 
 Do not return JSON, just the plain text answer.
 """
+HISTORICAL_FACT_MODEL = "gpt-4o"
+
+historical_fact_cache = PersistentLRUCache(
+    namespace="historical_fact",
+    version=prompt_version(HISTORICAL_FACT_PROMPT, HISTORICAL_FACT_MODEL),
+    max_entries=int(os.getenv("CHAT_NBA_ANSWER_CACHE_SIZE", "1000")),
+)
+
+
+def _original_question(user_query_details: dict) -> str:
+    return user_query_details.get("original_question", "that specific NBA historical fact")
+
+
+def _historical_fact_request(original_question: str) -> dict:
+    return _completion_request(HISTORICAL_FACT_MODEL, 0.1, HISTORICAL_FACT_PROMPT.format(original_question=original_question))
+
+
+def _historical_fact_failed(original_question: str, e: Exception) -> str:
+    print(f"⚠️ Error getting historical NBA fact from GPT for query '{original_question}':", e)
+    return f"Sorry, I couldn't answer the historical question '{original_question}' at the moment."
+
+
+def answer_historical_nba_fact_with_gpt(user_query_details: dict) -> str:
+    """
+    Answers a historical NBA factual question using GPT.
+    """
+    original_question = _original_question(user_query_details)
+    cache_key = canonicalize_query(original_question)
+    cached = historical_fact_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o", 
-            temperature=0.1, 
-            messages=[{"role": "user", "content": prompt}]
-        )
-        answer = response.choices[0].message.content
-        return answer.strip()
+        with stage("llm.historical_fact"):
+            response = get_client().chat.completions.create(**_historical_fact_request(original_question))
+        return _answer_from_response(response, HISTORICAL_FACT_MODEL, historical_fact_cache, cache_key)
     except Exception as e:
-        print(f"⚠️ Error getting historical NBA fact from GPT for query '{original_question}':", e)
-        return f"Sorry, I couldn't answer the historical question '{original_question}' at the moment."
+        return _historical_fact_failed(original_question, e)
 
 
-def parse_query_with_gpt(user_input: str) -> dict:
-    prompt = f"""
+async def answer_historical_nba_fact_with_gpt_async(user_query_details: dict) -> str:
+    original_question = _original_question(user_query_details)
+    cache_key = canonicalize_query(original_question)
+    cached = historical_fact_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        with stage("llm.historical_fact"):
+            response = await get_async_client().chat.completions.create(**_historical_fact_request(original_question))
+        return _answer_from_response(response, HISTORICAL_FACT_MODEL, historical_fact_cache, cache_key)
+    except Exception as e:
+        return _historical_fact_failed(original_question, e)
+
+
+async def stream_historical_nba_fact(user_query_details: dict):
+    """
+    Like answer_historical_nba_fact_with_gpt_async, but yields the answer as it is generated.
+    """
+    original_question = _original_question(user_query_details)
+    cache_key = canonicalize_query(original_question)
+    cached = historical_fact_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    streamed = False
+    try:
+        async for token in _stream_completion(_historical_fact_request(original_question), "llm.historical_fact", historical_fact_cache, cache_key):
+            streamed = True
+            yield token
+    except Exception as e:
+        failed = _historical_fact_failed(original_question, e)
+        if not streamed:
+            yield failed
+
+
+PARSE_QUERY_PROMPT = """
 You are a natural language to NBA stats translator. Your job is to take user questions and output structured JSON instructions.
 
 Here are some examples:
@@ -111,6 +302,16 @@ Output:
   "per_game": true
 }}
 ---
+User: compare Stephen Curry, Damian Lillard and Trae Young in points and assists over the last 3 seasons, totals and per game
+Output:
+{{
+  "action": "compare_players",
+  "players": ["Stephen Curry", "Damian Lillard", "Trae Young"],
+  "stats": ["points", "assists"],
+  "seasons": "last 3 seasons",
+  "per_mode": "Both"
+}}
+---
 User: Who leads the Warriors in scoring this season?
 Output:
 {{
@@ -145,6 +346,30 @@ Output:
   "stat_name": "PER"
 }}
 ---
+User: What are the records of the Lakers, Celtics and Knicks this season?
+Output:
+{{
+  "action": "get_team_records",
+  "team_names": ["Lakers", "Celtics", "Knicks"],
+  "season": "2024-2025"
+}}
+---
+User: Western Conference standings
+Output:
+{{
+  "action": "get_conference_standings",
+  "conference": "West",
+  "season": "2024-2025"
+}}
+---
+User: How many games back are the Knicks?
+Output:
+{{
+  "action": "get_games_back",
+  "team_name": "Knicks",
+  "season": "2024-2025"
+}}
+---
 User: What's the league average for 3PT% this season?
 Output:
 {{
@@ -153,8 +378,52 @@ Output:
   "season": "2024-2025"
 }}
 ---
+User: How does Nikola Jokic compare to the league average this season?
+Output:
+{{
+  "action": "compare_to_league_average",
+  "player_name": "Nikola Jokic",
+  "stats": [],
+  "season": "2024-2025"
+}}
+---
+User: Compare Stephen Curry's points and 3PT% to the league average in 2023-24
+Output:
+{{
+  "action": "compare_to_league_average",
+  "player_name": "Stephen Curry",
+  "stats": ["points", "3PT%"],
+  "season": "2023-24"
+}}
+---
+User: Where does Jalen Brunson rank in assists this season?
+Output:
+{{
+  "action": "get_player_rank",
+  "player_name": "Jalen Brunson",
+  "stats": ["assists"],
+  "season": "2024-2025"
+}}
+---
+User: How does Victor Wembanyama rank across the league in 2023-24?
+Output:
+{{
+  "action": "get_player_rank",
+  "player_name": "Victor Wembanyama",
+  "stats": [],
+  "season": "2023-24"
+}}
+---
 User: Show me Devin Booker's last 5 games
 Output:
+{{
+  "action": "get_player_game_log",
+  "player_name": "Devin Booker",
+  "limit": 5
+}}
+---
+User: Show me Devin Booker's last 5 games this season
+Output:
 {{
   "action": "get_player_game_log",
   "player_name": "Devin Booker",
@@ -162,6 +431,34 @@ Output:
   "limit": 5
 }}
 ---
+User: best scoring games of the last week
+Output:
+{{
+  "action": "get_best_games",
+  "stat": "points",
+  "date_range": "last week",
+  "limit": 10
+}}
+---
+User: who scored 40+ against the Celtics this season?
+Output:
+{{
+  "action": "get_games_against",
+  "team_name": "Celtics",
+  "stat": "points",
+  "minimum": 40,
+  "season": "2024-2025"
+}}
+---
+User: how does Jayson Tatum play against the Knicks this season?
+Output:
+{{
+  "action": "get_head_to_head",
+  "player_name": "Jayson Tatum",
+  "team_name": "Knicks",
+  "season": "2024-2025"
+}}
+---
 User: how many teams have come back from 3-1 down in the playoffs?
 Output:
 {{
@@ -174,19 +471,80 @@ User: {user_input}
 Output:
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        temperature=0,
-        messages=[{"role": "user", "content": prompt}]
-    )
+PARSE_QUERY_MODEL = "gpt-4o"
+
+# Parsed intents for repeat questions. Editing the prompt or model starts a fresh cache.
+intent_cache = PersistentLRUCache(
+    namespace="parse_query",
+    version=prompt_version(PARSE_QUERY_PROMPT, PARSE_QUERY_MODEL),
+    max_entries=int(os.getenv("CHAT_NBA_INTENT_CACHE_SIZE", "5000")),
+)
+
+
+def parse_query_with_gpt(user_input: str) -> dict:
+    cache_key = canonicalize_query(user_input)
+    cached_intent = intent_cache.get(cache_key)
+    if cached_intent is not None:
+        return cached_intent
 
-    output_text = response.choices[0].message.content
+    with stage("llm.parse"):
+        response = get_client().chat.completions.create(**_parse_request(user_input))
+    return _intent_from_response(cache_key, response)
 
+
+async def parse_query_with_gpt_async(user_input: str) -> dict:
+    cache_key = canonicalize_query(user_input)
+    cached_intent = intent_cache.get(cache_key)
+    if cached_intent is not None:
+        return cached_intent
+
+    with stage("llm.parse"):
+        response = await get_async_client().chat.completions.create(**_parse_request(user_input))
+    return _intent_from_response(cache_key, response)
+
+
+def _parse_request(user_input: str) -> dict:
+    return _completion_request(PARSE_QUERY_MODEL, 0, PARSE_QUERY_PROMPT.format(user_input=user_input))
+
+
+def _intent_from_response(cache_key: str, response) -> dict:
+    count_tokens(response, PARSE_QUERY_MODEL)
+    return _intent_from_output(cache_key, response.choices[0].message.content)
+
+
+def _intent_from_output(cache_key: str, output_text: str) -> dict:
     try:
         json_start = output_text.find("{")
         json_end = output_text.rfind("}") + 1
         json_str = output_text[json_start:json_end]
-        return json.loads(json_str)
+        intent = json.loads(json_str)
     except Exception as e:
         print("⚠️ Error parsing GPT output:", e)
         return {"error": "could not parse"}
+
+    intent_cache.set(cache_key, intent)
+    return intent
+
+
+def parse_query(user_input: str) -> dict:
+    """
+    Parses a question with the local rule-based parser, falling back to GPT
+    when the local parse is missing or not confident.
+    """
+    intent = parse_query_locally(user_input)
+    if intent is not None:
+        record_parse("local")
+        return intent
+
+    record_parse("llm")
+    return parse_query_with_gpt(user_input)
+
+
+async def parse_query_async(user_input: str) -> dict:
+    intent = parse_query_locally(user_input)
+    if intent is not None:
+        record_parse("local")
+        return intent
+
+    record_parse("llm")
+    return await parse_query_with_gpt_async(user_input)
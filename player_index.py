@@ -0,0 +1,139 @@
+"""
+Player name index: exact, accent/case-folded and fuzzy lookup over nba_api's static players.
+
+Built once per process on first use, or loaded from a pickle written by
+    python player_index.py --write .cache/player_index.pkl
+and pointed to with CHAT_NBA_PLAYER_INDEX.
+"""
+import argparse
+import os
+import pickle
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from nba_api.stats.static import players
+
+# Generational suffixes are dropped for the loose key, so "Jimmy Butler" finds "Jimmy Butler III"
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+# Fuzzy matches scoring below this are not returned
+MIN_FUZZY_SCORE = 0.45
+
+# A fuzzy match only resolves a name outright if it is this much better than the runner-up
+FUZZY_MARGIN = 0.1
+
+
+def fold(text: str) -> str:
+    # Lowercase and strip accents so "Dončić" and "doncic" compare equal
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def name_key(name: str) -> str:
+    # "Shaquille O'Neal" -> "shaquille oneal", "P.J. Tucker" -> "pj tucker"
+    text = re.sub(r"['.]", "", fold(name))
+    return " ".join(re.findall(r"\w+", text))
+
+
+def loose_key(name: str) -> str:
+    return " ".join(word for word in name_key(name).split() if word not in NAME_SUFFIXES)
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerIndex:
+    def __init__(self, player_list: list[dict]):
+        # Active players first, so they win when two players share a name
+        self.players = sorted(player_list, key=lambda p: not p["is_active"])
+        self.by_id = {p["id"]: p for p in self.players}
+        self.exact = {}
+        self.loose = {}
+        self.trigrams = defaultdict(set)
+        self.gram_counts = []
+        for position, player in enumerate(self.players):
+            self.exact.setdefault(name_key(player["full_name"]), position)
+            self.loose.setdefault(loose_key(player["full_name"]), position)
+            grams = _trigrams(loose_key(player["full_name"]))
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.trigrams[gram].add(position)
+
+    def lookup(self, name: str) -> dict | None:
+        """
+        O(1) lookup on the folded name, then on the name without suffixes.
+        """
+        position = self.exact.get(name_key(name))
+        if position is None:
+            position = self.loose.get(loose_key(name))
+        return self.players[position] if position is not None else None
+
+    def candidates(self, name: str, limit: int = 5) -> list[tuple[dict, float]]:
+        """
+        Ranked fuzzy matches as (player, score), score being trigram Jaccard similarity.
+        """
+        grams = _trigrams(loose_key(name))
+        overlap = defaultdict(int)
+        for gram in grams:
+            for position in self.trigrams.get(gram, ()):
+                overlap[position] += 1
+
+        scored = []
+        for position, shared in overlap.items():
+            score = shared / (len(grams) + self.gram_counts[position] - shared)
+            if score >= MIN_FUZZY_SCORE:
+                # Ties go to active players, which sort first
+                scored.append((-score, position))
+        scored.sort()
+        return [(self.players[position], -negative_score) for negative_score, position in scored[:limit]]
+
+    def resolve(self, name: str) -> dict | None:
+        player = self.lookup(name)
+        if player is not None:
+            return player
+        ranked = self.candidates(name, limit=2)
+        if not ranked:
+            return None
+        if len(ranked) == 1 or ranked[0][1] - ranked[1][1] >= FUZZY_MARGIN:
+            return ranked[0][0]
+        return None  # Too close to call
+
+
+_index: PlayerIndex | None = None
+_lock = threading.Lock()
+
+
+def get_player_index() -> PlayerIndex:
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                path = os.getenv("CHAT_NBA_PLAYER_INDEX")
+                if path and os.path.exists(path):
+                    with open(path, "rb") as f:
+                        _index = pickle.load(f)
+                else:
+                    _index = PlayerIndex(players.get_players())
+    return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and save the player name index.")
+    parser.add_argument("--write", required=True, help="path of the pickle to write")
+    args = parser.parse_args()
+
+    # Build through the module so the pickle refers to player_index.PlayerIndex, not __main__
+    import player_index
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.write)), exist_ok=True)
+    with open(args.write, "wb") as f:
+        pickle.dump(player_index.PlayerIndex(players.get_players()), f)
+    print(f"Wrote player index to {args.write}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from single_flight import SingleFlight
+from stats_cache import LIVE_SEASON_TTL, get_league_player_stats, is_completed_season
+
+# Minimum attempts for a player to count as a team leader in a percentage stat
+TEAM_LEADER_QUALIFIERS = {
+    "FG3_PCT": ("FG3A", 10),
+    "FT_PCT": ("FTA", 10),
+    "FG_PCT": ("FGA", 20),
+}
+
+# Minimum attempts to appear in league-wide rankings of a percentage stat
+LEAGUE_QUALIFIERS = {
+    "FG3_PCT": ("FG3A", 100),
+    "FT_PCT": ("FTA", 100),
+    "FG_PCT": ("FGA", 300),
+}
+
+# Minimum attempts to count towards the league average of a percentage stat
+AVERAGE_QUALIFIERS = {
+    "FG3_PCT": ("FG3A", 50),
+    "FT_PCT": ("FTA", 50),
+    "FG_PCT": ("FGA", 100),
+}
+
+SUMMARY_PERCENTILES = [0, 10, 25, 50, 75, 90, 100]
+
+# Stats where fewer is better, ranked lowest first
+LOWER_IS_BETTER = {"TOV", "PF"}
+
+# Numeric columns that are identifiers or rankings rather than stats
+NON_STAT_COLUMNS = {"PLAYER_ID", "TEAM_ID"}
+
+
+def stat_columns(df: pd.DataFrame) -> list[str]:
+    return [
+        col for col in df.columns
+        if pd.api.types.is_numeric_dtype(df[col])
+        and col not in NON_STAT_COLUMNS
+        and not col.endswith("_RANK")
+    ]
+
+
+def _compute_team_leaders(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a TEAM_ID-indexed frame whose cells are the row labels (into df)
+    of each team's leader in each stat column.
+    """
+    columns = stat_columns(df)
+    # idxmax on an all-NaN group is undefined, so rank NaNs last instead
+    values = df[columns].astype("float64").fillna(float("-inf"))
+    values["TEAM_ID"] = df["TEAM_ID"]
+
+    plain_columns = [col for col in columns if col not in TEAM_LEADER_QUALIFIERS]
+    leaders = values.groupby("TEAM_ID")[plain_columns].idxmax()
+
+    for col, (attempts_col, minimum) in TEAM_LEADER_QUALIFIERS.items():
+        if col not in columns or attempts_col not in df.columns:
+            continue
+        qualified = values[df[attempts_col] > minimum]
+        # Teams with no qualified player are left as NaN
+        leaders[col] = qualified.groupby("TEAM_ID")[col].idxmax()
+
+    return leaders
+
+
+def _compute_rank_index(df: pd.DataFrame, columns: list[str]) -> tuple[dict, dict, dict]:
+    """
+    Sorts every stat column once. Returns {column: row positions, best first} with
+    unqualified and missing rows left out, {column: rank position of each row}, and
+    {column: the ranked scores, worst first} for binary searches. A score is the
+    value, negated for LOWER_IS_BETTER stats.
+    """
+    values = df[columns].to_numpy(dtype="float64", na_value=np.nan)
+    for col, (attempts_col, minimum) in LEAGUE_QUALIFIERS.items():
+        if col in columns and attempts_col in df.columns:
+            values[(df[attempts_col] <= minimum).to_numpy(), columns.index(col)] = np.nan
+    values *= np.array([-1.0 if col in LOWER_IS_BETTER else 1.0 for col in columns])
+
+    missing = np.isnan(values)
+    # Best first, with missing values sorted after everything else
+    order = np.argsort(np.where(missing, np.inf, -values), axis=0, kind="stable")
+    positions = np.empty_like(order)
+    positions[order, np.arange(len(columns))] = np.arange(len(df))[:, None]
+    counts = len(df) - missing.sum(axis=0)
+
+    rank_order = {col: order[:counts[j], j] for j, col in enumerate(columns)}
+    rank_positions = {col: positions[:, j] for j, col in enumerate(columns)}
+    sorted_scores = {col: values[rank_order[col][::-1], j] for j, col in enumerate(columns)}
+    return rank_order, rank_positions, sorted_scores
+
+
+def _compute_summary(df: pd.DataFrame, columns: list[str]) -> dict[str, dict]:
+    """
+    {column: {"count", "mean", "std", "min", "p10", "p25", "median", "p75", "p90", "max"}}
+    for every stat column, over all players, with the AVERAGE_QUALIFIERS columns
+    also summarized over qualified players only as "<column>_QUALIFIED".
+    """
+    qualified = [col for col, (attempts_col, _) in AVERAGE_QUALIFIERS.items() if col in columns and attempts_col in df.columns]
+    values = df[columns].to_numpy(dtype="float64", na_value=np.nan)
+    # Qualified variants are extra columns with unqualified players blanked out
+    extra = np.column_stack([
+        np.where((df[AVERAGE_QUALIFIERS[col][0]] >= AVERAGE_QUALIFIERS[col][1]).to_numpy(), values[:, columns.index(col)], np.nan)
+        for col in qualified
+    ]) if qualified else np.empty((len(df), 0))
+    values = np.hstack([values, extra])
+    names = columns + [f"{col}_QUALIFIED" for col in qualified]
+
+    counts = (~np.isnan(values)).sum(axis=0)
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN columns summarize to NaN
+        means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0, ddof=1)
+        percentiles = np.nanpercentile(values, SUMMARY_PERCENTILES, axis=0)
+
+    summary = {}
+    for j, name in enumerate(names):
+        low, p10, p25, median, p75, p90, high = percentiles[:, j]
+        summary[name] = {
+            "count": int(counts[j]), "mean": means[j], "std": stds[j], "min": low,
+            "p10": p10, "p25": p25, "median": median, "p75": p75, "p90": p90, "max": high,
+        }
+    return summary
+
+
+class SeasonFrame:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.loaded_at = time.time()
+        self.stat_columns = stat_columns(df)
+        self.team_leaders = _compute_team_leaders(df) if not df.empty else pd.DataFrame()
+        self.rank_order, self.rank_positions, self.sorted_scores = _compute_rank_index(df, self.stat_columns)
+        self.row_of_player = {player_id: row for row, player_id in enumerate(df["PLAYER_ID"])} if "PLAYER_ID" in df.columns else {}
+        self.summary = _compute_summary(df, self.stat_columns) if not df.empty else {}
+
+    def top_players(self, stat_column: str, limit: int) -> pd.DataFrame:
+        # Leaders in a stat (fewest first for LOWER_IS_BETTER), with the LEAGUE_QUALIFIERS attempt filters applied
+        return self.df.iloc[self.rank_order[stat_column][:limit]]
+
+    def ranks_of(self, player_id: int, stat_columns: list[str]) -> dict[str, tuple | None] | None:
+        """
+        Returns {column: (value, rank, number of ranked players, percentile)} with
+        None for stats the player does not qualify for, or None if the player is
+        not in the frame. Tied players share the best rank; the percentile is the
+        share of ranked players the player is level with or better than.
+        """
+        row = self.row_of_player.get(player_id)
+        if row is None:
+            return None
+        ranks = {}
+        for col in stat_columns:
+            ranked = self.sorted_scores[col]
+            position = int(self.rank_positions[col][row])
+            if position >= len(ranked):
+                ranks[col] = None
+                continue
+            # Ranked scores are worst first, rank positions best first
+            score = ranked[len(ranked) - 1 - position]
+            at_or_below = int(np.searchsorted(ranked, score, side="right"))
+            value = -score if col in LOWER_IS_BETTER else score
+            ranks[col] = (value, len(ranked) - at_or_below + 1, len(ranked), 100.0 * at_or_below / len(ranked))
+        return ranks
+
+    def league_summary(self, stat_column: str) -> dict | None:
+        # Percentage stats are averaged over players with enough attempts
+        return self.summary.get(f"{stat_column}_QUALIFIED", self.summary.get(stat_column))
+
+    def team_players(self, team_id: int) -> pd.DataFrame:
+        return self.df[self.df["TEAM_ID"] == team_id]
+
+    def team_leader(self, team_id: int, stat_column: str) -> pd.Series | None:
+        if team_id not in self.team_leaders.index or stat_column not in self.team_leaders.columns:
+            return None
+        row_label = self.team_leaders.at[team_id, stat_column]
+        if pd.isna(row_label):
+            return None
+        return self.df.loc[row_label]
+
+
+_frames: dict[tuple, SeasonFrame] = {}
+_lock = threading.Lock()
+_loads = SingleFlight()
+
+
+def get_season_frame(season: str, per_mode: str = "Totals", season_type: str = "Regular Season") -> SeasonFrame:
+    """
+    Loads the league-wide frame for a season once and keeps it in memory,
+    along with every team's leader and the league summary of every stat.
+    """
+    key = (season, season_type, per_mode)
+    with _lock:
+        frame = _frames.get(key)
+    if frame is not None and (is_completed_season(season) or time.time() - frame.loaded_at < LIVE_SEASON_TTL):
+        return frame
+
+    def load():
+        loaded = SeasonFrame(get_league_player_stats(season, season_type=season_type, per_mode=per_mode))
+        with _lock:
+            _frames[key] = loaded
+        return loaded
+
+    # Concurrent callers for the same season build its indexes once
+    return _loads.do(key, load)
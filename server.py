@@ -0,0 +1,265 @@
+"""
+HTTP/JSON server, so one process (and one set of caches) can answer a whole team.
+
+    python server.py --port 8080
+
+    POST /query               {"question": "Who led the league in assists in 2015-16?"}
+    POST /actions/<action>    the action's intent fields, e.g. /actions/get_top_players
+                              {"stat": "PTS", "season": "2023-24", "limit": 3}
+    GET  /actions             every action and the fields it reads
+    GET  /metrics             counters since startup, in Prometheus text format
+    GET  /health
+
+Connections are handled on threads, but every query runs on one asyncio loop and
+one QueryEngine, so all requests share the same stats thread pool, rate limiter and
+memory and disk caches. At most --max-in-flight queries run at once; a request that
+cannot get a slot within --queue-seconds is answered 503 with Retry-After instead
+of queueing without bound.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from metrics import count, render_metrics
+
+
+def default_max_in_flight() -> int:
+    # Queries running at once before new requests wait for a slot.
+    # Read when a server is built, so values from .env are seen.
+    return int(os.getenv("CHAT_NBA_SERVER_MAX_IN_FLIGHT", "16"))
+
+
+def default_queue_seconds() -> float:
+    # Seconds a request waits for a slot before it is turned away with 503
+    return float(os.getenv("CHAT_NBA_SERVER_QUEUE_SECONDS", "1"))
+
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024
+
+# Seconds a client gets to send its request before the connection is dropped
+READ_TIMEOUT = 10
+
+# Actions answered by GPT rather than nba_stats, and the intent fields they read
+GPT_ACTION_FIELDS = {
+    "explain_stat": ["stat_name"],
+    "get_historical_nba_fact": ["original_question"],
+}
+
+
+class _FieldRecorder(dict):
+    # Stands in for an intent to learn which fields an action's kwargs builder reads
+    def __init__(self):
+        super().__init__()
+        self.fields = []
+
+    def get(self, key, default=None):
+        self.fields.append(key)
+        return default
+
+
+def action_fields() -> dict[str, list[str]]:
+    from engine import STATS_ACTIONS
+
+    actions = {}
+    for action, (_, build_kwargs) in STATS_ACTIONS.items():
+        intent = _FieldRecorder()
+        build_kwargs(intent)
+        actions[action] = intent.fields
+    actions.update(GPT_ACTION_FIELDS)
+    return actions
+
+
+class EngineThread:
+    """
+    Runs a QueryEngine on an event loop in a background thread; handler threads
+    submit coroutines to it and block on the result.
+    """
+
+    def __init__(self, max_workers: int | None = None, timeout: float | None = None):
+        from engine import DEFAULT_TIMEOUT, DEFAULT_WORKERS, QueryEngine
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="chat-nba-engine", daemon=True)
+        self.thread.start()
+        self.engine = QueryEngine(max_workers=max_workers or DEFAULT_WORKERS, timeout=timeout or DEFAULT_TIMEOUT)
+
+    def run(self, coroutine):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        # The engine enforces its own timeout; this only guards against a stuck loop
+        return future.result(self.engine.timeout + 5)
+
+    def close(self):
+        self.engine.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+
+class ChatNBAServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, engine: EngineThread, max_in_flight: int | None = None,
+                 queue_seconds: float | None = None, quiet: bool = False):
+        super().__init__(address, ChatNBAHandler)
+        self.engine = engine
+        self.slots = threading.BoundedSemaphore(max_in_flight or default_max_in_flight())
+        self.queue_seconds = queue_seconds if queue_seconds is not None else default_queue_seconds()
+        self.quiet = quiet
+        self.actions = action_fields()
+
+
+class ChatNBAHandler(BaseHTTPRequestHandler):
+    server: ChatNBAServer
+    server_version = "ChatNBA/1.0"
+    protocol_version = "HTTP/1.1"
+    timeout = READ_TIMEOUT
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/actions":
+            self._send_json(200, {"actions": self.server.actions})
+        elif path == "/metrics":
+            self._send(200, render_metrics().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": f"❌ No such endpoint: {path}"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._read_json()
+        if body is None:
+            return
+
+        if path == "/query":
+            question = body.get("question")
+            if not isinstance(question, str) or not question.strip():
+                self._send_json(400, {"error": "❌ Expected a JSON body with a non-empty 'question'."})
+                return
+            self._run(lambda engine: engine.answer(question.strip(), timeout=self._timeout(body)))
+        elif path.startswith("/actions/"):
+            action = path[len("/actions/"):]
+            if action not in self.server.actions:
+                self._send_json(404, {"error": f"❌ Unknown action: {action}"})
+                return
+            intent = {**body, "action": action}
+            self._run(lambda engine: engine.answer_intent(intent, timeout=self._timeout(body)))
+        else:
+            self._send_json(404, {"error": f"❌ No such endpoint: {path}"})
+
+    def _run(self, make_coroutine):
+        from batch import result_to_json
+
+        if not self.server.slots.acquire(timeout=self.server.queue_seconds):
+            count("server_requests", outcome="rejected")
+            self._send_json(503, {"error": "❌ Server is busy, try again shortly."}, {"Retry-After": "1"})
+            return
+        try:
+            result = self.server.engine.run(make_coroutine(self.server.engine.engine))
+        except Exception as e:
+            count("server_requests", outcome="error")
+            self._send_json(500, {"error": f"❌ Error answering request: {e}"})
+            return
+        finally:
+            self.server.slots.release()
+        count("server_requests", outcome="answered")
+        payload = result_to_json(result)
+        payload["total_ms"] = round(result.trace.total_ms(), 3)
+        self._send_json(200, payload)
+
+    def _timeout(self, body: dict) -> float | None:
+        # Clients may ask for less time than the server allows, never more
+        requested = body.get("timeout")
+        if isinstance(requested, (int, float)) and requested > 0:
+            return min(float(requested), self.server.engine.engine.timeout)
+        return None
+
+    def _read_json(self) -> dict | None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {"error": "❌ Content-Length must be a non-negative integer."})
+            return None
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": f"❌ Request body over {MAX_BODY_BYTES} bytes."})
+            return None
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            self._send_json(400, {"error": "❌ Request body is not valid JSON."})
+            return None
+        if not isinstance(body, dict):
+            self._send_json(400, {"error": "❌ Request body must be a JSON object."})
+            return None
+        return body
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        self._send(status, json.dumps(payload, default=str).encode("utf-8"), "application/json", headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def serve(host: str, port: int, max_in_flight: int | None = None, queue_seconds: float | None = None,
+          workers: int | None = None, timeout: float | None = None, quiet: bool = False) -> ChatNBAServer:
+    """
+    Starts a server in a background thread and returns it; call shutdown_server() to stop it.
+    Port 0 picks a free port (see server.server_address).
+    """
+    engine = EngineThread(workers, timeout)
+    server = ChatNBAServer((host, port), engine, max_in_flight, queue_seconds, quiet)
+    threading.Thread(target=server.serve_forever, name="chat-nba-server", daemon=True).start()
+    return server
+
+
+def shutdown_server(server: ChatNBAServer):
+    server.shutdown()
+    server.server_close()
+    server.engine.close()
+
+
+def main():
+    # Before anything reads CHAT_NBA_* settings; the engine and caches are imported after this
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-in-flight", type=int, default=default_max_in_flight(), help="queries answered at once")
+    parser.add_argument("--queue-seconds", type=float, default=default_queue_seconds(), help="wait for a slot before answering 503")
+    parser.add_argument("--workers", type=int, help="threads for nba_api calls (default CHAT_NBA_WORKERS)")
+    parser.add_argument("--timeout", type=float, help="seconds per query (default CHAT_NBA_QUERY_TIMEOUT)")
+    parser.add_argument("--quiet", action="store_true", help="do not log every request")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.max_in_flight, args.queue_seconds, args.workers, args.timeout, args.quiet)
+    host, port = server.server_address[:2]
+    print(f"Chat NBA server listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_server(server)
+
+
+if __name__ == "__main__":
+    main()
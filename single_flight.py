@@ -0,0 +1,50 @@
+"""
+Single-flight call coalescing: concurrent calls with the same key share one execution.
+
+The first caller for a key runs the function; callers arriving while it is running
+wait for it and get the same result, or the same exception if it failed. Once the
+call finishes the key is forgotten, so later callers run it again (usually hitting
+a cache the first call filled).
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+        # Calls that were served by another caller's execution
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
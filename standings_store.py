@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pandas as pd
+
+from single_flight import SingleFlight
+from stats_cache import LIVE_SEASON_TTL, get_league_standings, is_completed_season
+
+
+class StandingsSnapshot:
+    """
+    A season's standings, with each team's row found by TeamID and games back
+    filled in where the API leaves them out.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.reset_index(drop=True)
+        if not df.empty and "ConferenceGamesBack" not in df.columns:
+            df = df.assign(ConferenceGamesBack=_games_back(df))
+        self.df = df
+        self.loaded_at = time.time()
+        self.row_of_team = {team_id: row for row, team_id in enumerate(df["TeamID"])} if "TeamID" in df.columns else {}
+        self.conferences = {name: _ranked(teams) for name, teams in df.groupby("Conference")} if "Conference" in df.columns else {}
+
+    def team(self, team_id: int) -> pd.Series | None:
+        row = self.row_of_team.get(team_id)
+        return None if row is None else self.df.iloc[row]
+
+    def conference(self, conference: str) -> pd.DataFrame:
+        return self.conferences.get(conference, self.df.iloc[0:0])
+
+
+def _ranked(teams: pd.DataFrame) -> pd.DataFrame:
+    rank = "PlayoffRank" if "PlayoffRank" in teams.columns else "WinPCT"
+    return teams.sort_values(rank, ascending=rank == "PlayoffRank", kind="stable")
+
+
+def _games_back(df: pd.DataFrame) -> pd.Series:
+    # Half the difference in wins plus losses from the conference's best record
+    leader = df.loc[df.groupby("Conference")["WinPCT"].idxmax(), ["Conference", "WINS", "LOSSES"]].set_index("Conference")
+    leader_wins = df["Conference"].map(leader["WINS"])
+    leader_losses = df["Conference"].map(leader["LOSSES"])
+    return ((leader_wins - df["WINS"]) + (df["LOSSES"] - leader_losses)) / 2
+
+
+_snapshots: dict[tuple, StandingsSnapshot] = {}
+_lock = threading.Lock()
+_loads = SingleFlight()
+
+
+def get_standings(season: str, season_type: str = "Regular Season") -> StandingsSnapshot:
+    """
+    Loads a season's standings once and keeps them in memory: for good once the
+    season is over, for CHAT_NBA_LIVE_TTL seconds while it is being played.
+    """
+    key = (season, season_type)
+    with _lock:
+        snapshot = _snapshots.get(key)
+    if snapshot is not None and (is_completed_season(season) or time.time() - snapshot.loaded_at < LIVE_SEASON_TTL):
+        return snapshot
+
+    def load():
+        loaded = StandingsSnapshot(get_league_standings(season, season_type))
+        with _lock:
+            _snapshots[key] = loaded
+        return loaded
+
+    return _loads.do(key, load)
@@ -0,0 +1,312 @@
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from columnar import FRAME_SUFFIX, compact_frame, read_frame, write_frame
+from metrics import count, stage
+from nba_http import fetch_endpoint
+from single_flight import SingleFlight
+
+# Where cached frames live. Override with CHAT_NBA_CACHE_DIR in .env if needed.
+CACHE_DIR = os.getenv("CHAT_NBA_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# Seconds before a frame for the season in progress is considered stale.
+# Completed seasons never expire.
+LIVE_SEASON_TTL = int(os.getenv("CHAT_NBA_LIVE_TTL", "900"))
+
+# Offline mode serves every frame from a bundle built by bundle.py and never calls the API.
+# CHAT_NBA_BUNDLE is a bundle directory, or a folder of bundles (the newest is used).
+BUNDLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bundles")
+OFFLINE = os.getenv("CHAT_NBA_OFFLINE", "").lower() in ("1", "true", "yes")
+BUNDLE_PATH = os.getenv("CHAT_NBA_BUNDLE", BUNDLES_DIR)
+
+# Set by bundle.py while building: (bundle directory, manifest entries)
+_recorder = None
+
+# (BUNDLE_PATH, bundle directory it resolved to), so the folder is only scanned once
+_bundle_dir = None
+
+
+class OfflineDataMissing(Exception):
+    pass
+
+
+def set_offline(enabled: bool, bundle_path: str | None = None):
+    global OFFLINE, BUNDLE_PATH
+    OFFLINE = enabled
+    if bundle_path is not None:
+        BUNDLE_PATH = bundle_path
+
+
+def resolve_bundle_dir(path: str) -> str:
+    if os.path.exists(os.path.join(path, "manifest.json")):
+        return path
+    # A folder of versioned bundles: use the most recently finished one
+    manifests = [
+        os.path.join(path, entry, "manifest.json") for entry in os.listdir(path)
+    ] if os.path.isdir(path) else []
+    manifests = [manifest for manifest in manifests if os.path.exists(manifest)]
+    if not manifests:
+        raise OfflineDataMissing(f"No offline bundle found at {path}. Build one with 'python bundle.py'.")
+    return os.path.dirname(max(manifests, key=os.path.getmtime))
+
+
+def start_recording(bundle_dir: str):
+    global _recorder
+    _recorder = (bundle_dir, [])
+
+
+def stop_recording() -> list[dict]:
+    global _recorder
+    entries = _recorder[1] if _recorder else []
+    _recorder = None
+    return entries
+
+
+def current_season() -> str:
+    # Same convention as parse_season_range: a season is treated as finished from July on,
+    # so in August 2024 the "live" season is 2024-25 and 2023-24 is frozen.
+    now = datetime.now()
+    start_year = now.year if now.month >= 7 else now.year - 1
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def is_completed_season(season: str) -> bool:
+    if not re.match(r"^\d{4}-\d{2}$", season or ""):
+        return False  # Unknown format, never freeze it
+    # "YYYY-YY" strings sort chronologically
+    return season < current_season()
+
+
+def _cache_path(endpoint: str, params: dict, root: str | None = None) -> str:
+    key = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(root or CACHE_DIR, endpoint, f"{digest}{FRAME_SUFFIX}")
+
+
+def _is_fresh(path: str, season: str) -> bool:
+    if not os.path.exists(path):
+        return False
+    if is_completed_season(season):
+        return True
+    return time.time() - os.path.getmtime(path) < LIVE_SEASON_TTL
+
+
+_fetches = SingleFlight()
+
+
+def cached_frame(endpoint: str, params: dict, season: str, fetch, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Returns the frame stored for (endpoint, params), calling fetch() to refresh it
+    when missing or stale. Empty frames are returned but never stored.
+    With columns, only those columns (where they exist) are loaded.
+    The returned frame may be shared with other callers; copy it before modifying it.
+    """
+    if OFFLINE:
+        global _bundle_dir
+        if _bundle_dir is None or _bundle_dir[0] != BUNDLE_PATH:
+            _bundle_dir = (BUNDLE_PATH, resolve_bundle_dir(BUNDLE_PATH))
+        bundle_path = _cache_path(endpoint, params, root=_bundle_dir[1])
+        if not os.path.exists(bundle_path):
+            count("stats_cache", endpoint=endpoint, result="offline_missing")
+            raise OfflineDataMissing(f"{endpoint} {params} is not in the offline bundle.")
+        count("stats_cache", endpoint=endpoint, result="offline")
+        with stage("stats_cache.read"):
+            return read_frame(bundle_path, columns)
+
+    path = _cache_path(endpoint, params)
+    df = None
+    if _is_fresh(path, season):
+        try:
+            with stage("stats_cache.read"):
+                df = read_frame(path, columns if _recorder is None else None)
+            count("stats_cache", endpoint=endpoint, result="hit")
+        except Exception:
+            pass  # Corrupt entry, fall through and refetch
+
+    if df is None:
+        led = False
+
+        def refresh():
+            nonlocal led
+            led = True
+            with stage(f"stats_cache.fetch.{endpoint}"):
+                fresh = compact_frame(fetch())
+            if not fresh.empty:
+                try:
+                    write_frame(path, fresh)
+                except OSError as e:
+                    print(f"⚠️ Could not write stats cache entry {path}:", e)
+            return fresh
+
+        # The path is a digest of the endpoint and its full parameter set, so concurrent
+        # callers asking for the same frame wait on one request and share its result
+        df = _fetches.do(path, refresh)
+        count("stats_cache", endpoint=endpoint, result="miss" if led else "shared")
+
+    if _recorder is not None and not df.empty:
+        bundle_dir, entries = _recorder
+        bundle_path = _cache_path(endpoint, params, root=bundle_dir)
+        write_frame(bundle_path, df)
+        entries.append({
+            "endpoint": endpoint,
+            "params": params,
+            "file": os.path.relpath(bundle_path, bundle_dir),
+            "rows": len(df),
+        })
+
+    if columns is not None:
+        df = df[[col for col in dict.fromkeys(columns) if col in df.columns]]
+    return df
+
+
+def get_league_player_stats(season: str, season_type: str = "Regular Season", per_mode: str = "Totals", team_id: int | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+    params = {
+        "season": season,
+        "season_type": season_type,
+        "per_mode": per_mode,
+        "team_id": team_id,
+    }
+
+    def fetch():
+        # Endpoint modules are imported on a cache miss only; the package imports all of nba_api's endpoints
+        from nba_api.stats.endpoints import leaguedashplayerstats
+
+        kwargs = {
+            "season": season,
+            "season_type_all_star": season_type,
+            "per_mode_detailed": per_mode,
+        }
+        if team_id is not None:
+            kwargs["team_id_nullable"] = team_id
+        return fetch_endpoint(leaguedashplayerstats.LeagueDashPlayerStats, **kwargs).get_data_frames()[0]
+
+    return cached_frame("leaguedashplayerstats", params, season, fetch, columns)
+
+
+def get_league_standings(season: str, season_type: str = "Regular Season", columns: list[str] | None = None) -> pd.DataFrame:
+    params = {"season": season, "season_type": season_type}
+
+    def fetch():
+        from nba_api.stats.endpoints import leaguestandingsv3
+
+        return fetch_endpoint(leaguestandingsv3.LeagueStandingsV3, season=season, season_type=season_type).get_data_frames()[0]
+
+    return cached_frame("leaguestandingsv3", params, season, fetch, columns)
+
+
+def get_league_game_log(season: str, season_type: str = "Regular Season", columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Every player's line in every game of a season, from one league-wide request.
+    """
+    params = {"season": season, "season_type": season_type, "player_or_team": "P"}
+
+    def fetch():
+        from nba_api.stats.endpoints import leaguegamelog
+
+        return fetch_endpoint(
+            leaguegamelog.LeagueGameLog,
+            season=season,
+            season_type_all_star=season_type,
+            player_or_team_abbreviation="P",
+        ).get_data_frames()[0]
+
+    return cached_frame("leaguegamelog", params, season, fetch, columns)
+
+
+def game_dates(dates: pd.Series) -> pd.Series:
+    # stats.nba.com writes GAME_DATE as "APR 14, 2024"
+    parsed = pd.to_datetime(dates, format="%b %d, %Y", errors="coerce")
+    if parsed.isna().all() and not dates.isna().all():
+        parsed = pd.to_datetime(dates, errors="coerce")
+    return parsed
+
+
+def _synced_game_log(params: dict, fetch, columns: list[str] | None) -> pd.DataFrame:
+    """
+    The game log of a season in progress. Once the stored log is older than
+    LIVE_SEASON_TTL, only games on or after its last GAME_DATE are fetched and
+    added to it, instead of the whole season again.
+    """
+    path = _cache_path("playergamelog", params)
+    if _is_fresh(path, params["season"]):
+        try:
+            with stage("stats_cache.read"):
+                df = read_frame(path, columns)
+            count("stats_cache", endpoint="playergamelog", result="hit")
+            return df
+        except Exception:
+            pass  # Corrupt entry, fall through and refetch
+
+    outcome = "shared"
+
+    def refresh():
+        nonlocal outcome
+        try:
+            stored = read_frame(path) if os.path.exists(path) else None
+        except Exception:
+            stored = None
+        last_date = game_dates(stored["GAME_DATE"]).max() if stored is not None and not stored.empty else None
+
+        if last_date is None or pd.isna(last_date):
+            outcome = "miss"
+            with stage("stats_cache.fetch.playergamelog"):
+                merged = compact_frame(fetch())
+        else:
+            outcome = "delta"
+            # The last stored date is asked for again, in case it was stored while that game was on
+            with stage("stats_cache.fetch.playergamelog.delta"):
+                new = compact_frame(fetch(last_date.strftime("%m/%d/%Y")))
+            count("game_log_delta_rows", len(new))
+            # Both are newest first; the fetched copy of a game wins
+            merged = pd.concat([new, stored], ignore_index=True).drop_duplicates("Game_ID", keep="first") if not new.empty else stored
+
+        if not merged.empty:
+            try:
+                write_frame(path, merged)
+            except OSError as e:
+                print(f"⚠️ Could not write stats cache entry {path}:", e)
+        return merged
+
+    df = _fetches.do(path, refresh)
+    count("stats_cache", endpoint="playergamelog", result=outcome)
+    if columns is not None:
+        df = df[[col for col in dict.fromkeys(columns) if col in df.columns]]
+    return df
+
+
+def get_player_game_log_frame(player_id: int, season: str, season_type: str = "Regular Season", columns: list[str] | None = None) -> pd.DataFrame:
+    params = {"player_id": player_id, "season": season, "season_type": season_type}
+
+    def fetch(date_from: str = ""):
+        from nba_api.stats.endpoints import playergamelog
+
+        return fetch_endpoint(
+            playergamelog.PlayerGameLog,
+            player_id=player_id,
+            season=season,
+            season_type_all_star=season_type,
+            date_from_nullable=date_from,
+        ).get_data_frames()[0]
+
+    if is_completed_season(season) or OFFLINE or _recorder is not None:
+        # Completed seasons are fetched once and kept for good
+        return cached_frame("playergamelog", params, season, fetch, columns)
+    return _synced_game_log(params, fetch, columns)
+
+
+def get_player_career_stats(player_id: int, per_mode: str = "PerGame", columns: list[str] | None = None) -> pd.DataFrame:
+    params = {"player_id": player_id, "per_mode": per_mode}
+
+    def fetch():
+        from nba_api.stats.endpoints import playercareerstats
+
+        return fetch_endpoint(playercareerstats.PlayerCareerStats, player_id=player_id, per_mode36=per_mode).get_data_frames()[0]
+
+    # A career keeps growing while the current season is being played
+    return cached_frame("playercareerstats", params, current_season(), fetch, columns)
@@ -0,0 +1,161 @@
+"""
+One alias table for every way a team gets named: full names, nicknames, abbreviations,
+unambiguous cities, slang and historical franchise names, each mapped to a team ID.
+
+Aliases that moved between franchises ("Hornets", "Seattle") carry the range of
+seasons they apply to, so lookups can be season-aware.
+"""
+import re
+import threading
+from collections import defaultdict
+
+from nba_api.stats.static import teams
+
+from player_index import fold
+
+# alias -> current full name of the franchise
+TEAM_SLANG = {
+    "sixers": "Philadelphia 76ers",
+    "dubs": "Golden State Warriors",
+    "cavs": "Cleveland Cavaliers",
+    "mavs": "Dallas Mavericks",
+    "wolves": "Minnesota Timberwolves",
+    "t-wolves": "Minnesota Timberwolves",
+    "twolves": "Minnesota Timberwolves",
+    "blazers": "Portland Trail Blazers",
+    "trailblazers": "Portland Trail Blazers",
+    "pels": "New Orleans Pelicans",
+    "grizz": "Memphis Grizzlies",
+    "nugs": "Denver Nuggets",
+    "celts": "Boston Celtics",
+    "clips": "Los Angeles Clippers",
+    "la clippers": "Los Angeles Clippers",
+    "la lakers": "Los Angeles Lakers",
+    "okc": "Oklahoma City Thunder",
+    "philly": "Philadelphia 76ers",
+    "golden state": "Golden State Warriors",
+}
+
+# (name, current full name of the franchise, first season start year, last season start year)
+HISTORICAL_NAMES = [
+    ("Seattle SuperSonics", "Oklahoma City Thunder", 1967, 2007),
+    ("SuperSonics", "Oklahoma City Thunder", 1967, 2007),
+    ("Sonics", "Oklahoma City Thunder", 1967, 2007),
+    ("Seattle", "Oklahoma City Thunder", 1967, 2007),
+    ("New Jersey Nets", "Brooklyn Nets", 1977, 2011),
+    ("New Jersey", "Brooklyn Nets", 1977, 2011),
+    ("New York Nets", "Brooklyn Nets", 1976, 1976),
+    ("Charlotte Bobcats", "Charlotte Hornets", 2004, 2013),
+    ("Bobcats", "Charlotte Hornets", 2004, 2013),
+    # The 1988-2002 Charlotte Hornets belong to today's Charlotte franchise;
+    # the 2002-2013 New Orleans Hornets are today's Pelicans
+    ("Hornets", "New Orleans Pelicans", 2002, 2012),
+    ("New Orleans Hornets", "New Orleans Pelicans", 2002, 2012),
+    ("New Orleans/Oklahoma City Hornets", "New Orleans Pelicans", 2005, 2006),
+    ("Vancouver Grizzlies", "Memphis Grizzlies", 1995, 2000),
+    ("Vancouver", "Memphis Grizzlies", 1995, 2000),
+    ("Washington Bullets", "Washington Wizards", 1974, 1996),
+    ("Capital Bullets", "Washington Wizards", 1973, 1973),
+    ("Baltimore Bullets", "Washington Wizards", 1963, 1972),
+    ("Bullets", "Washington Wizards", 1963, 1996),
+    ("Kansas City Kings", "Sacramento Kings", 1975, 1984),
+    ("Kansas City-Omaha Kings", "Sacramento Kings", 1972, 1974),
+    ("Kansas City", "Sacramento Kings", 1972, 1984),
+    ("Cincinnati Royals", "Sacramento Kings", 1957, 1971),
+    ("Rochester Royals", "Sacramento Kings", 1948, 1956),
+    ("Royals", "Sacramento Kings", 1948, 1971),
+    ("San Diego Clippers", "Los Angeles Clippers", 1978, 1983),
+    ("Buffalo Braves", "Los Angeles Clippers", 1970, 1977),
+    ("Braves", "Los Angeles Clippers", 1970, 1977),
+    ("San Diego Rockets", "Houston Rockets", 1967, 1970),
+    ("San Diego", "Los Angeles Clippers", 1978, 1983),
+    ("San Diego", "Houston Rockets", 1967, 1970),
+    ("Minneapolis Lakers", "Los Angeles Lakers", 1948, 1959),
+    ("Philadelphia Warriors", "Golden State Warriors", 1946, 1961),
+    ("San Francisco Warriors", "Golden State Warriors", 1962, 1970),
+    ("Syracuse Nationals", "Philadelphia 76ers", 1949, 1962),
+    ("Nationals", "Philadelphia 76ers", 1949, 1962),
+    ("St. Louis Hawks", "Atlanta Hawks", 1955, 1967),
+    ("Milwaukee Hawks", "Atlanta Hawks", 1951, 1954),
+    ("Tri-Cities Blackhawks", "Atlanta Hawks", 1949, 1950),
+    ("New Orleans Jazz", "Utah Jazz", 1974, 1978),
+    ("Fort Wayne Pistons", "Detroit Pistons", 1948, 1956),
+    ("Chicago Zephyrs", "Washington Wizards", 1962, 1962),
+    ("Chicago Packers", "Washington Wizards", 1961, 1961),
+]
+
+
+def alias_key(name: str) -> str:
+    # "St. Louis Hawks" -> "st louis hawks", "the Lakers'" -> "lakers"
+    text = re.sub(r"'s?\b|'|\.", "", fold(name))
+    text = re.sub(r"^the ", "", " ".join(text.split()))
+    return text
+
+
+def season_start_year(season: str | None) -> int | None:
+    match = re.match(r"^(\d{4})", season or "")
+    return int(match.group(1)) if match else None
+
+
+class TeamIndex:
+    def __init__(self, team_list: list[dict]):
+        self.by_id = {team["id"]: team for team in team_list}
+        by_full_name = {team["full_name"]: team["id"] for team in team_list}
+        self.abbreviations = {alias_key(team["abbreviation"]) for team in team_list}
+        # alias key -> [(team_id, display name, first season, last season)]
+        self.aliases = defaultdict(list)
+
+        cities = defaultdict(list)
+        for team in team_list:
+            self._add(team["full_name"], team["id"], team["full_name"])
+            self._add(team["nickname"], team["id"], team["full_name"])
+            self._add(team["abbreviation"], team["id"], team["full_name"])
+            cities[team["city"]].append(team)
+        # Cities shared by two teams (Los Angeles) are ambiguous and left out
+        for city, city_teams in cities.items():
+            if len(city_teams) == 1:
+                self._add(city, city_teams[0]["id"], city_teams[0]["full_name"])
+        for slang, full_name in TEAM_SLANG.items():
+            self._add(slang, by_full_name[full_name], full_name)
+        for name, full_name, first, last in HISTORICAL_NAMES:
+            self._add(name, by_full_name[full_name], name, first, last)
+
+    def _add(self, alias: str, team_id: int, display_name: str, first: int | None = None, last: int | None = None):
+        entries = self.aliases[alias_key(alias)]
+        if not any(entry[0] == team_id and entry[2:] == (first, last) for entry in entries):
+            entries.append((team_id, display_name, first, last))
+
+    def lookup(self, name: str, season: str | None = None) -> tuple[int, str] | None:
+        """
+        Returns (team_id, display name) for an alias, or None.
+
+        With a season, the alias that applied that season wins ("Hornets" in 2005-06
+        is New Orleans); without one, the alias's current meaning does.
+        """
+        entries = self.aliases.get(alias_key(name))
+        if not entries:
+            return None
+        year = season_start_year(season)
+        if year is not None:
+            for team_id, display_name, first, last in entries:
+                if first is not None and first <= year <= last:
+                    return team_id, display_name
+        # Current names have no season range; fall back to the most recent historical one
+        current = [entry for entry in entries if entry[2] is None]
+        if current:
+            return current[0][:2]
+        latest = max(entries, key=lambda entry: entry[3])
+        return latest[:2]
+
+
+_index: TeamIndex | None = None
+_lock = threading.Lock()
+
+
+def get_team_index() -> TeamIndex:
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = TeamIndex(teams.get_teams())
+    return _index
@@ -1,15 +1,16 @@
-from rich.console import Console
-from rich.text import Text
-
-console = Console()
+import os
+import shutil
+import sys
 
 # --- Pixel Art Generation Settings ---
 BLOCK = "█"
 EMPTY = " "
 
-# Colors
-MAIN_COLOR_STYLE = "bold #1D428A"   # Darker NBA Blue for letters
-RULE_LINE_COLOR_STYLE = "bold #1D428A" # Same blue for rule lines
+# Colors, as ANSI escapes so printing the banner doesn't need rich
+MAIN_COLOR_STYLE = "\x1b[1;38;2;29;66;138m"   # Bold darker NBA Blue (#1D428A) for letters
+RULE_LINE_COLOR_STYLE = "\x1b[1;38;2;29;66;138m" # Same blue for rule lines
+RESET_STYLE = "\x1b[0m"
+RULE_CHAR = "─"
 
 # Letter definitions (7 rows high)
 LETTERS = {
@@ -87,7 +88,7 @@ GLITCH_ROWS_INDICES = [2, 3, 4]
 GLITCH_TARGETS_WORD1 = {}  # No glitch for "CHAT"
 GLITCH_TARGETS_WORD2 = {}  # No glitch for "NBA" (removed 'B')
 
-def generate_styled_art(text_part1, text_part2, console_instance):
+def generate_art_lines(text_part1, text_part2):
     words_data = []
 
     for char_code in text_part1:
@@ -117,18 +118,13 @@ def generate_styled_art(text_part1, text_part2, console_instance):
         if char_data['definition']:
             canvas_width_chars += len(char_data['definition'][0])
     
-    # Calculate max possible width considering potential glitch (even if none active)
-    # If no letters are glitched, GLITCH_OFFSET_X won't effectively add width if is_glitched is false for all.
-    # However, to be safe for canvas sizing, we include it. The actual_render_width will trim later.
+    # Include the glitch offset in the canvas width only if any letter is glitched
     max_possible_glitch_for_any_letter = 0
     if GLITCH_TARGETS_WORD1 or GLITCH_TARGETS_WORD2: # Check if any glitch is active
         max_possible_glitch_for_any_letter = GLITCH_OFFSET_X
 
     canvas_width = canvas_width_chars + max_possible_glitch_for_any_letter
-    canvas_height = LETTER_HEIGHT
-
-    EMPTY_CELL_DATA = (EMPTY, None)
-    canvas = [[EMPTY_CELL_DATA for _ in range(canvas_width)] for _ in range(canvas_height)]
+    canvas = [[EMPTY for _ in range(canvas_width)] for _ in range(LETTER_HEIGHT)]
 
     current_x_base = 0
 
@@ -141,65 +137,32 @@ def generate_styled_art(text_part1, text_part2, console_instance):
             current_x_base += len(LETTERS[' '][0]) if char_data['char'] == ' ' else 3
             continue
             
-        char_def_width = len(char_definition[0])
-        
         for r_idx, row_str in enumerate(char_definition):
             # Glitch shift will be 0 if is_glitched is False
             glitch_shift = GLITCH_OFFSET_X if is_glitched and r_idx in GLITCH_ROWS_INDICES else 0
             for c_idx, pixel in enumerate(row_str):
-                if pixel == '#':
-                    cr = r_idx 
-                    cc = current_x_base + c_idx + glitch_shift
-                    if 0 <= cr < canvas_height and 0 <= cc < canvas_width:
-                        canvas[cr][cc] = (BLOCK, MAIN_COLOR_STYLE)
-        
-        current_x_base += char_def_width
-
-    # Determine the actual maximum width used on the canvas
-    actual_render_width = 0
-    for r in range(canvas_height):
-        for c in range(canvas_width - 1, -1, -1): # Iterate from right to left
-            if canvas[r][c][0] != EMPTY:
-                actual_render_width = max(actual_render_width, c + 1)
-                break # Found the last character in this row
-    
-    # If nothing was drawn, default to a small width to avoid issues
-    if actual_render_width == 0 and canvas_width_chars > 0 :
-        actual_render_width = canvas_width_chars
-
-
-    output_lines_text = []
-    for r in range(canvas_height):
-        line_text_obj = Text()
-        has_content_in_row = False
-        # Iterate up to the actual content width to avoid trailing spaces in Text object
-        for c in range(actual_render_width): 
-            char_to_print, style = canvas[r][c]
-            line_text_obj.append(char_to_print, style=style if style else "")
-            if char_to_print != EMPTY:
-                has_content_in_row = True
+                cc = current_x_base + c_idx + glitch_shift
+                if pixel == '#' and 0 <= cc < canvas_width:
+                    canvas[r_idx][cc] = BLOCK
         
-        # Only add line if it has content or is within the defined letter height
-        # This ensures all 7 rows are printed, even if a row of a letter is all spaces
-        if has_content_in_row or r < LETTER_HEIGHT :
-             output_lines_text.append(line_text_obj)
+        current_x_base += len(char_definition[0])
 
-    # Trim empty Text objects from the bottom, just in case
-    final_lines_to_print = []
-    for line_obj in reversed(output_lines_text):
-        if line_obj.plain.strip() or final_lines_to_print: # Keep if non-space or if we've kept subsequent lines
-            final_lines_to_print.append(line_obj)
-    final_lines_to_print.reverse()
+    # Every row is kept, trailing spaces trimmed
+    return ["".join(row).rstrip() for row in canvas]
 
 
-    for line_text_obj in final_lines_to_print:
-        console_instance.print(line_text_obj)
+# Computed once at import; printing the banner is then a single write
+ART_LINES = generate_art_lines("CHAT", "NBA")
 
 
 def print_banner():
-    console.rule(style=RULE_LINE_COLOR_STYLE)
-    generate_styled_art("CHAT", "NBA", console)
-    console.rule(style=RULE_LINE_COLOR_STYLE)
+    rule = RULE_CHAR * shutil.get_terminal_size().columns
+    art = ART_LINES
+    if sys.stdout.isatty() and not os.getenv("NO_COLOR"):
+        rule = f"{RULE_LINE_COLOR_STYLE}{rule}{RESET_STYLE}"
+        art = [f"{MAIN_COLOR_STYLE}{line}{RESET_STYLE}" for line in ART_LINES]
+    sys.stdout.write("\n".join([rule, *art, rule]) + "\n")
+    sys.stdout.flush()
 
 if __name__ == "__main__":
-    print_banner()
\ No newline at end of file
+    print_banner()